@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass, field
 from datetime import date
-from typing import List, Optional, Dict, Type
+from typing import TYPE_CHECKING, Any, List, Mapping, Optional, Dict, Tuple, Type, get_args
+
+from Utilities.Colors import Color
+from Utilities.Enums import ChangeKind
+
+if TYPE_CHECKING:
+    from .Spreadsheet import FormatMode, WritebackMode
 ################################################################################
 
 __all__ = (
@@ -17,6 +24,12 @@ __all__ = (
     "SheetRoutingRuleWrite",
     "SheetRoutingRuleRead",
     "ApplicationState",
+    "NameParseCacheEntry",
+    "SheetLayout",
+    "RecordChange",
+    "SpreadsheetMetadata",
+    "WorksheetMetadata",
+    "RunOptions",
 )
 
 ################################################################################
@@ -76,7 +89,7 @@ class ServiceAccountRecord:
 class _CSRDataBase:
 
     raw: List[str] = field(default_factory=list)
-    highlight: Dict[str, float] = field(default_factory=dict)
+    highlight: Optional[Color] = None
 
     def to_values_array(self) -> List[str]:
         return []
@@ -198,9 +211,14 @@ class SheetRoutingRuleRead(SheetRoutingRuleWrite, Identifiable):
     dirty: bool = False
 
     def matches(self, record: QBServiceRecord) -> bool:
-        _min = self.min_amount or float("-inf")
-        _max = self.max_amount or float("inf")
-        return _min <= abs(record.amount) <= _max
+        return self.contains(abs(record.amount))
+
+    def contains(self, amount: float) -> bool:
+        _min, _max = self.bounds()
+        return _min <= amount <= _max
+
+    def bounds(self) -> Tuple[float, float]:
+        return self.min_amount or float("-inf"), self.max_amount or float("inf")
 
 ################################################################################
 @dataclass
@@ -211,3 +229,103 @@ class ApplicationState:
     id: int = -1
 
 ################################################################################
+@dataclass
+class NameParseCacheEntry:
+
+    raw: str
+    account_id: int
+    name: str
+    # JSON list of [first, last, raw] member name triples
+    members: str
+
+################################################################################
+@dataclass
+class SheetLayout:
+
+    spreadsheet_id: str
+    title: str
+    sheet_id: int
+    id: int = -1
+
+################################################################################
+@dataclass
+class RecordChange:
+
+    sheet: str
+    kind: ChangeKind
+    # The record's content key, unique within its sheet for one load
+    key: str
+    # Row in the new tab, or the old tab's row for deletions
+    row: int
+    before: Any = None
+    after: Any = None
+
+################################################################################
+@dataclass(frozen=True)
+class SpreadsheetMetadata:
+
+    id: str
+    title: str
+    # colorType -> rgbColor
+    theme_colors: Mapping[str, Mapping[str, float]]
+    # Title -> sheetId of every tab in the payload
+    sheet_ids: Mapping[str, int]
+
+################################################################################
+@dataclass(frozen=True)
+class WorksheetMetadata:
+
+    sheet_id: int
+    title: str
+    # Title without any date suffixes
+    base_title: str
+    grid_properties: Mapping[str, Any]
+    # Column index -> pixel width
+    column_sizes: Mapping[int, int]
+
+################################################################################
+@dataclass(frozen=True)
+class RunOptions:
+    """Opt-in load, reconcile and writeback settings for a run."""
+
+    probe_rows: bool = False
+    stream: bool = False
+    persist_name_cache: bool = False
+    mode: WritebackMode = "sequential"
+    formats: FormatMode = "inline"
+    track_changes: bool = False
+
+    def __post_init__(self) -> None:
+
+        # Patching writes only what changed, which needs the loaded snapshot
+        if self.mode == "patch" and not self.track_changes:
+            object.__setattr__(self, "track_changes", True)
+
+    @classmethod
+    def from_env(cls) -> RunOptions:
+        """
+        Reads the RECONCILER_* settings from the environment (or `.env`).
+        Unknown values are reported and left at their defaults.
+        """
+
+        from .Spreadsheet import FormatMode, WritebackMode
+
+        def _choice(name: str, choices: Tuple[str, ...], default: str) -> str:
+            value = os.getenv(name)
+            if value is None:
+                return default
+            if value not in choices:
+                print(f"Ignoring {name}={value!r}; expected one of {', '.join(choices)}.")
+                return default
+            return value
+
+        return cls(
+            probe_rows=os.getenv("RECONCILER_PROBE_ROWS") == "True",
+            stream=os.getenv("RECONCILER_STREAM_QB") == "True",
+            persist_name_cache=os.getenv("RECONCILER_PERSIST_NAME_CACHE") == "True",
+            mode=_choice("RECONCILER_WRITEBACK_MODE", get_args(WritebackMode), cls.mode),
+            formats=_choice("RECONCILER_FORMATS", get_args(FormatMode), cls.formats),
+            track_changes=os.getenv("RECONCILER_TRACK_CHANGES") == "True",
+        )
+
+################################################################################
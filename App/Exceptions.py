@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, List, Any, Literal, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Literal, Optional, Hashable
 
 if TYPE_CHECKING:
     from .Classes import *
@@ -20,6 +20,14 @@ class ReconcilerException(Exception):
     def sort_key(self) -> Any:
         raise NotImplementedError("Subclasses must implement sort_key method.")
 
+    def dedup_key(self) -> Hashable:
+        # Errors without a row index are never collapsed.
+        return type(self).__name__, id(self)
+
+    @property
+    def category(self) -> str:
+        return type(self).__name__
+
 ################################################################################
 class NameMissingError(ReconcilerException):
 
@@ -124,6 +132,9 @@ class QBParsingError(ReconcilerException):
     def sort_key(self) -> Any:
         return 2, self.index
 
+    def dedup_key(self) -> Hashable:
+        return self.index
+
 ################################################################################
 class UnableToRouteException(ReconcilerException):
 
@@ -172,6 +183,9 @@ class UnableToRouteException(ReconcilerException):
     def sort_key(self) -> Any:
         return 3, self.qb.index
 
+    def dedup_key(self) -> Hashable:
+        return self.index
+
 ################################################################################
 class NoRecordsToReconcileException(ReconcilerException):
 
@@ -226,6 +240,9 @@ class NoRecordsToReconcileException(ReconcilerException):
     def sort_key(self) -> Any:
         return 4, self.sheet_name, self.qb_record.index
 
+    def dedup_key(self) -> Hashable:
+        return self.index
+
 ################################################################################
 class NoMatchingRecordException(ReconcilerException):
 
@@ -282,6 +299,9 @@ class NoMatchingRecordException(ReconcilerException):
     def sort_key(self) -> Any:
         return 5, self.sheet_name, self.qb_record.index
 
+    def dedup_key(self) -> Hashable:
+        return self.index
+
 ################################################################################
 class NumericParseError(ReconcilerException):
 
@@ -319,6 +339,9 @@ class NumericParseError(ReconcilerException):
     def sort_key(self) -> Any:
         return 6, self.sheet_name, self.index
 
+    def dedup_key(self) -> Hashable:
+        return self.index
+
 ################################################################################
 def fmt_value(
     value: str,
@@ -1,17 +1,21 @@
 from __future__ import annotations
 # Don't clean up imports! They're marked as unused but we need them.
 import csv
-from collections import defaultdict
+import json
+from collections import Counter, defaultdict
 from datetime import date
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Hashable, Iterator, Optional, Set, Tuple
 
 from .Classes import *
-from GClient.Client import GSheetsClient
-from Utilities import Utilities as U
+from Database import UnitOfWork
+from GClient.AsyncClient import GSheetsFacade
+from GClient.Registry import get_client
+from Utilities import Utilities as U, NAME_PARSE_CACHE, ParsedAccountName
 from .Exceptions import *
 from .RuleManager import RoutingRuleManager
-from .Spreadsheet import Spreadsheet
+from .Spreadsheet import FormatMode, Spreadsheet, WritebackMode
+from ._WorksheetFactory import _WorksheetFactory
 
 if TYPE_CHECKING:
     from .Worksheets.WorksheetBase import _WorksheetBase
@@ -20,6 +24,23 @@ if TYPE_CHECKING:
 
 __all__ = ("ServiceReconciler", )
 
+# Default number of QB records handed to the reconciler at a time when streaming.
+QB_CHUNK_SIZE = 5000
+
+# Field masks for spreadsheet_get. The worksheet parsers only read cell values,
+# background colors and column widths; everything else Google would return
+# (text runs, borders, full effective formats...) is left out of the payload.
+META_FIELDS = ",".join((
+    "spreadsheetId",
+    "properties(title,spreadsheetTheme)",
+    "sheets.properties(sheetId,title,gridProperties)",
+))
+GRID_FIELDS = ",".join((
+    META_FIELDS,
+    "sheets.data.rowData.values(formattedValue,effectiveFormat.backgroundColorStyle)",
+    "sheets.data.columnMetadata.pixelSize",
+))
+
 ################################################################################
 class ServiceReconciler:
 
@@ -27,95 +48,321 @@ class ServiceReconciler:
         "_client",
         "_spreadsheet",
         "_qb",
+        "_qb_stream",
+        "_qb_count",
+        "_chunk_size",
         "_errors",
+        "_error_counts",
         "_rule_mgr",
+        "_persist_name_cache",
     )
 
 ################################################################################
-    def __init__(self, rule_mgr: RoutingRuleManager) -> None:
+    def __init__(self, rule_mgr: RoutingRuleManager, *, persist_name_cache: bool = False) -> None:
 
-        self._client: GSheetsClient = GSheetsClient()
+        self._client: GSheetsFacade = get_client()
         self._spreadsheet: Optional[Spreadsheet] = None
-        self._errors: List[ReconcilerException] = []
+        # Keyed by ReconcilerException.dedup_key(); first occurrence wins.
+        self._errors: Dict[Hashable, ReconcilerException] = {}
+        self._error_counts: Counter[str] = Counter()
 
         self._qb: Dict[date, List[QBServiceRecord]] = defaultdict(list)
+        # Set when the export is streamed from disk instead of held in self._qb.
+        self._qb_stream: Optional[Path] = None
+        self._qb_count: int = 0
+        self._chunk_size: Optional[int] = None
         self._rule_mgr: RoutingRuleManager = rule_mgr
 
+        self._persist_name_cache: bool = persist_name_cache
+        if persist_name_cache:
+            self.load_name_cache()
+
+################################################################################
+    def load_data(
+        self,
+        spreadsheet_id: str,
+        last_run_date: Optional[date],
+        *,
+        probe_rows: bool = False,
+        track_changes: bool = False
+    ) -> None:
+        """
+        Loads the relevant worksheets. Each sheet's grid request is limited to
+        its worksheet class' RELEVANT_COLS. With ``probe_rows`` set, a cheap
+        values-only request first finds the last row with a name in column A,
+        so pre-allocated blank rows below it are not downloaded either.
+        ``track_changes`` is needed for patch writeback and RecordDiff.
+        """
+
+        relevant = Spreadsheet.relevant_titles(last_run_date)
+
+        # 1) Fast path: go straight for the grid data using the tabs remembered
+        #    from the previous run.
+        rich_payload = self._load_from_remembered_layout(spreadsheet_id, relevant, probe_rows)
+
+        if rich_payload is None:
+            rich_payload = self._load_with_discovery(spreadsheet_id, relevant, probe_rows)
+            if rich_payload is None:
+                return
+
+        # 2) Build Spreadsheet object from the rich payload
+        self._spreadsheet = Spreadsheet(
+            client=self._client,
+            payload=rich_payload,
+            last_run_date=last_run_date,
+            track_changes=track_changes
+        )
+        print(f"Loaded spreadsheet with {len(self._spreadsheet._sheets)} relevant sheets.")
+
+        self._remember_layout(
+            spreadsheet_id,
+            [sheet.get("properties", {}) for sheet in rich_payload.get("sheets", [])]
+        )
+
 ################################################################################
-    def load_data(self, spreadsheet_id: str, last_run_date: Optional[date]) -> None:
+    def _load_with_discovery(
+        self,
+        spreadsheet_id: str,
+        relevant: Set[str],
+        probe_rows: bool
+    ) -> Optional[Dict[str, Any]]:
 
         try:
-            meta_payload = self._client.spreadsheet_get(spreadsheet_id)
+            meta_payload = self._client.spreadsheet_get(spreadsheet_id, fields=META_FIELDS)
         except Exception as ex:
             print(f"Error loading spreadsheet metadata: {ex}")
-            return
+            return None
 
         sheets = meta_payload.get("sheets", [])
-        ranges: list[str] = []
         row_counts: Dict[str, int] = {}
 
         for sheet in sheets:
             props = sheet.get("properties", {})
             title: str | None = props.get("title")
             grid = props.get("gridProperties", {}) or {}
-            row_count: int = grid.get("rowCount", 0) or 0
-            col_count: int = grid.get("columnCount", 0) or 0
-
-            suffix = last_run_date.strftime("%m-%d-%Y") if last_run_date is not None else ""
-            if title not in {
-                f"Annual{suffix}",
-                f"Monthly{suffix}",
-                f"Plumbing - Annual{suffix}",
-                f"Generator{suffix}",
-                f"Duct Cleaning{suffix}"
-            }:
+
+            if title not in relevant:
                 continue
 
-            row_counts[title] = row_count
+            row_counts[title] = grid.get("rowCount", 0) or 0
 
-            # If we know rows & columns, build a tight range; otherwise fall back to whole sheet
-            if row_count > 0 and col_count > 0:
-                end_col = U.index_to_column(col_count)
-                ranges.append(f"{title}!A1:{end_col}{row_count}")
-            else:
-                # Just ask for the whole sheet if grid properties are missing
-                ranges.append(title)
+        if probe_rows and row_counts:
+            try:
+                row_counts.update(self._probe_last_rows(spreadsheet_id, list(row_counts)))
+            except Exception as ex:
+                print(f"Error probing sheet row counts: {ex}")
 
-        # 3) Second request: rich grid data for the computed ranges
+        # 2) Second request: rich grid data for the computed ranges
         try:
-            rich_payload = self._client.spreadsheet_get(
+            return self._client.spreadsheet_get(
                 spreadsheet_id=spreadsheet_id,
-                ranges=ranges,
+                ranges=[self._grid_range(title, row_count) for title, row_count in row_counts.items()],
                 include_grid_data=True,
+                fields=GRID_FIELDS,
+                use_cache=True,
             )
         except Exception as ex:
             print(f"Error loading spreadsheet grid data: {ex}")
             # fall back to metadata-only payload if something goes wrong
-            rich_payload = meta_payload
+            return meta_payload
 
-        # 4) Build Spreadsheet object from the rich payload
-        self._spreadsheet = Spreadsheet(
-            client=self._client,
-            payload=rich_payload,
-            last_run_date=last_run_date
-        )
-        print(f"Loaded spreadsheet with {len(self._spreadsheet._sheets)} relevant sheets.")
+################################################################################
+    def _load_from_remembered_layout(
+        self,
+        spreadsheet_id: str,
+        relevant: Set[str],
+        probe_rows: bool
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Requests grid data for the tabs remembered from the last load or
+        writeback without a metadata round trip. Returns None, so the caller
+        rediscovers the layout, unless every relevant tab is remembered and
+        comes back with its remembered sheetId. A tab added since, or
+        renamed, deleted or recreated, therefore triggers a rediscovery
+        rather than being left out of the load.
+        """
+        with UnitOfWork() as db:
+            layouts = db.sheet_layouts.list_for(spreadsheet_id)
+
+        sheet_ids = {layout.title: layout.sheet_id for layout in layouts if layout.title in relevant}
+        if set(sheet_ids) != relevant:
+            return None
+        titles = list(sheet_ids)
+
+        try:
+            # Rows may have been added since the layout was stored, so unless
+            # probing, ask for the full height of the relevant columns.
+            row_counts = self._probe_last_rows(spreadsheet_id, titles) if probe_rows else {}
+            payload = self._client.spreadsheet_get(
+                spreadsheet_id=spreadsheet_id,
+                ranges=[self._grid_range(title, row_counts.get(title, 0)) for title in titles],
+                include_grid_data=True,
+                fields=GRID_FIELDS,
+                use_cache=True,
+            )
+        except Exception as ex:
+            print(f"Remembered sheet layout is out of date ({ex}). Rediscovering sheets...")
+            return None
+
+        fetched = {
+            sheet.get("properties", {}).get("title"): sheet.get("properties", {}).get("sheetId")
+            for sheet in payload.get("sheets", [])
+        }
+        if fetched != sheet_ids:
+            print("Remembered sheet layout doesn't match the spreadsheet. Rediscovering sheets...")
+            return None
+
+        return payload
 
 ################################################################################
-    def load_qb_export(self, csv_addr: Path) -> None:
+    @staticmethod
+    def _remember_layout(spreadsheet_id: str, sheet_props: List[Dict[str, Any]]) -> None:
 
+        layouts = [
+            SheetLayout(
+                spreadsheet_id=spreadsheet_id,
+                title=props["title"],
+                sheet_id=props["sheetId"],
+            )
+            for props in sheet_props
+            if props.get("title") and _WorksheetFactory.class_for(props["title"]) is not None
+        ]
+        if not layouts:
+            return
+
+        with UnitOfWork() as db:
+            db.sheet_layouts.replace_for(spreadsheet_id, layouts)
+
+################################################################################
+    @staticmethod
+    def _grid_range(title: str, row_count: int) -> str:
+
+        ws_cls = _WorksheetFactory.class_for(title)
+        assert ws_cls is not None
+        start_col, end_col = ws_cls.RELEVANT_COLS.split(":")
+
+        # If we know the row count, build a tight range; otherwise take the whole columns
+        if row_count > 0:
+            return U.absolute_range(title, f"{start_col}1:{end_col}{row_count}")
+        return U.absolute_range(title, f"{start_col}:{end_col}")
+
+################################################################################
+    def _probe_last_rows(self, spreadsheet_id: str, titles: List[str]) -> Dict[str, int]:
+        """Returns the last row with a value in column A for each sheet."""
+
+        payload = self._client.values_batch_get(
+            spreadsheet_id,
+            params={
+                "ranges": [U.absolute_range(title, "A:A") for title in titles],
+                "majorDimension": "ROWS",
+                "fields": "valueRanges.values",
+            }
+        )
+
+        # valueRanges come back in request order; trailing empty rows are omitted.
+        return {
+            title: max(len(value_range.get("values", [])), 1)
+            for title, value_range in zip(titles, payload.get("valueRanges", []))
+        }
+
+################################################################################
+    def load_qb_export(
+        self,
+        csv_addr: Path,
+        *,
+        stream: bool = False,
+        chunk_size: int = QB_CHUNK_SIZE
+    ) -> None:
+        """
+        Loads the QuickBooks export. With ``stream`` set, only a lightweight
+        scan is done here and records are parsed, routed and reconciled in
+        chunks of about ``chunk_size`` during reconcile_all. Streaming needs
+        each invoice date's rows to be contiguous in the file (as QuickBooks
+        exports them); otherwise the whole export is loaded as before.
+
+        Each date is sorted by amount before it is reconciled, so a chunk
+        never splits a date. At most ``chunk_size`` plus the largest single
+        date's records are held at once; an export where most invoices share
+        one date is held almost entirely.
+        """
         assert csv_addr.exists(), f"CSV file not found: {csv_addr}"
 
+        if stream:
+            count = self._scan_qb_export(csv_addr)
+            if count is not None:
+                self._qb_stream = csv_addr
+                self._qb_count = count
+                self._chunk_size = chunk_size
+                print(f"Streaming {count} QB records in chunks of {chunk_size}.")
+                return
+            print("QB export is not grouped by date. Loading the full export instead.")
+
+        for parsed in self._iter_qb_records(csv_addr):
+            self._qb[parsed.date].append(parsed)
+
+        self._qb_count = sum(len(v) for v in self._qb.values())
+        print(f"Loaded {self._qb_count} QB records.")
+
+################################################################################
+    @staticmethod
+    def _iter_qb_rows(csv_addr: Path) -> Iterator[Tuple[int, Dict[str, str]]]:
+
         with open(csv_addr, "r", encoding="cp1252") as csv_file:
             reader = csv.DictReader(csv_file)
             for i, row in enumerate(reader):
-                parsed = self._parse_qb_record(row, i)
-                if parsed is None:
-                    continue
+                yield i, row
+
+################################################################################
+    def _iter_qb_records(self, csv_addr: Path) -> Iterator[QBServiceRecord]:
+
+        for i, row in self._iter_qb_rows(csv_addr):
+            parsed = self._parse_qb_record(row, i)
+            if parsed is None:
+                continue
+
+            yield parsed
+
+################################################################################
+    def _scan_qb_export(self, csv_addr: Path) -> Optional[int]:
+        """
+        Counts the records that will parse, without keeping them. Returns None
+        if an invoice date shows up again after a different date, since the
+        streamed pipeline could not then reproduce the loaded ordering.
+        """
+        seen: Set[Optional[date]] = set()
+        current: Optional[date] = None
+        count = 0
+
+        for _, row in self._iter_qb_rows(csv_addr):
+            if U.parse_account_name(row["Name"]) is None:
+                continue
+
+            row_date = U.iso_date_from_str(row["Date"])
+            if count == 0 or row_date != current:
+                if row_date in seen:
+                    return None
+                seen.add(row_date)
+                current = row_date
+            count += 1
+
+        return count
+
+################################################################################
+    def _iter_date_groups(self) -> Iterator[List[QBServiceRecord]]:
 
-                self._qb[parsed.date].append(parsed)
+        if self._qb_stream is None:
+            yield from self._qb.values()
+            return
+
+        group: List[QBServiceRecord] = []
+        for parsed in self._iter_qb_records(self._qb_stream):
+            if group and parsed.date != group[0].date:
+                yield group
+                group = []
+            group.append(parsed)
 
-        print(f"Loaded {sum(len(v) for v in self._qb.values())} QB records.")
+        if group:
+            yield group
 
 ################################################################################
     def _parse_qb_record(
@@ -125,34 +372,74 @@ class ServiceReconciler:
     ) -> Optional[QBServiceRecord]:
 
         name_str = row["Name"]
-        split_result = U.split_name_and_account(name_str)
-        if split_result is None:
+        parsed = U.parse_account_name(name_str)
+        if parsed is None:
             if self.is_mostly_empty(row):
                 return None
-            self._errors.append(QBParsingError(
+            self._add_error(QBParsingError(
                 row,
                 idx,
                 f"Failed to split name and account ID: '{name_str}'"
             ))
             return None
 
-        account_id, name_without_id = split_result
-        member_names = U.split_multi_names(name_without_id)
         _, amount = U.make_numeric(row["Amount"], default=0.0)
 
         return QBServiceRecord(
             raw=row,
             index=idx,
-            account_id=account_id,
+            account_id=parsed.account_id,
             names=[
                 MemberName(first=n[0], last=n[1], raw=n[2])
-                for n in member_names
+                for n in parsed.members
             ],
             memo=row["Memo"],
             amount=amount,
             date=U.iso_date_from_str(row["Date"])
         )
 
+################################################################################
+    @staticmethod
+    def load_name_cache() -> None:
+        """Seeds the shared name parse cache from the database."""
+
+        with UnitOfWork() as db:
+            entries = db.name_cache.list_all()
+
+        NAME_PARSE_CACHE.seed(
+            (
+                e.raw,
+                ParsedAccountName(
+                    account_id=e.account_id,
+                    name=e.name,
+                    members=tuple(tuple(m) for m in json.loads(e.members))
+                )
+            )
+            for e in entries
+        )
+        print(f"Loaded {len(entries)} cached customer names.")
+
+################################################################################
+    @staticmethod
+    def save_name_cache() -> None:
+        """Replaces the stored name parse cache with the current in-memory one."""
+
+        entries = [
+            NameParseCacheEntry(
+                raw=raw,
+                account_id=parsed.account_id,
+                name=parsed.name,
+                members=json.dumps(parsed.members)
+            )
+            for raw, parsed in NAME_PARSE_CACHE.items()
+        ]
+
+        with UnitOfWork() as db:
+            db.name_cache.replace_all(entries)
+
+        print(f"Saved {len(entries)} cached customer names "
+              f"({NAME_PARSE_CACHE.hits} hits, {NAME_PARSE_CACHE.misses} misses this session).")
+
 ################################################################################
     def thresholds_menu(self) -> None:
 
@@ -180,7 +467,7 @@ class ServiceReconciler:
 ################################################################################
     def reconcile_all(self, phase_signal: SignalInstance, log_signal: SignalInstance) -> None:
 
-        total_records = sum(len(v) for v in self._qb.values())
+        total_records = self._qb_count
         if total_records == 0:
             log_signal.emit("No QB records to reconcile.")
             phase_signal.emit("Reconciling...", 25)
@@ -211,22 +498,16 @@ class ServiceReconciler:
             phase_signal.emit("Reconciling...", mapped)
             log_signal.emit(f"Reconciliation progress: {bucket}% ({processed}/{total_records} records processed)")
 
-        for invoice_date in self._qb.keys():
-            qb_records = sorted(self._qb[invoice_date], key=lambda r: r.amount)
+        assert self._spreadsheet is not None
+        sheets: Dict[str, _WorksheetBase] = {}
 
-            for qb in qb_records:
-                if qb.account_id == 177860658:
-                    # Debug breakpoint
-                    pass
-
-                if qb.amount == 0:
-                    continue
-
-                target_sheet_name = self._rule_mgr.get_target_sheet(qb)
+        for work in self._iter_work_chunks():
+            for qb, target_sheet_name in work:
                 assert target_sheet_name is not None
 
-                assert self._spreadsheet is not None
-                target_sheet: _WorksheetBase = self._spreadsheet[target_sheet_name]  # type: ignore
+                target_sheet = sheets.get(target_sheet_name)
+                if target_sheet is None:
+                    target_sheet = sheets[target_sheet_name] = self._spreadsheet[target_sheet_name]
                 assert target_sheet is not None
                 target_sheet.reconcile_record(qb)
 
@@ -239,27 +520,65 @@ class ServiceReconciler:
 
         emit_bucket(100)
 
+        if self._persist_name_cache:
+            self.save_name_cache()
+
 ################################################################################
-    def write_to_destination(self, date_str: str) -> None:
+    def _iter_work_chunks(self) -> Iterator[List[Tuple[QBServiceRecord, str]]]:
+        """
+        Yields (record, target sheet) pairs in the order they are reconciled:
+        invoice dates as loaded, ascending amount within each date, zero
+        amounts dropped. Each date's amounts are routed in one batch call
+        against the compiled rule table. A loaded export is yielded as a
+        single chunk; a streamed one in chunks of at least the configured
+        size, always ending on a date boundary. A chunk therefore holds fewer
+        than chunk_size records plus the whole of its last date.
+        """
+        work: List[Tuple[QBServiceRecord, str]] = []
+
+        for group in self._iter_date_groups():
+            ordered = [qb for qb in sorted(group, key=lambda r: r.amount) if qb.amount != 0]
+            targets = self._rule_mgr.route_amounts([qb.amount for qb in ordered])
+            work.extend(zip(ordered, targets))
+
+            if self._chunk_size is not None and len(work) >= self._chunk_size:
+                yield work
+                work = []
+
+        if work:
+            yield work
+
+################################################################################
+    def write_to_destination(
+        self,
+        date_str: str,
+        *,
+        mode: WritebackMode = "sequential",
+        formats: FormatMode = "inline"
+    ) -> None:
 
-        self._spreadsheet.final_batch_update(self, date_str)
+        new_tabs = self._spreadsheet.final_batch_update(self, date_str, mode=mode, formats=formats)
+        # The next run will read from the tabs we just created.
+        self._remember_layout(self._spreadsheet.id, new_tabs)
 
 ################################################################################
     def format_all_errors(self, sheet_id: Optional[int]) -> Dict[str, Any]:
 
         for sheet in self._spreadsheet._sheets:
-            self._errors.extend(sheet._errors)
+            for error in sheet._errors:
+                self._add_error(error)
             sheet._errors.clear()
 
-        self._deduplicate_errors()
         print(len(self._errors), "unique errors found during reconciliation. Writing...")
+        for category, count in self._error_counts.items():
+            print(f"  {category}: {count}")
 
         if sheet_id:
             request = {
                 "appendCells": {
                     "sheetId": sheet_id,
                     "fields": "*",
-                    "rows": [e.to_row_data() for e in sorted(self._errors, key=lambda e: e.sort_key())]
+                    "rows": [e.to_row_data() for e in sorted(self._errors.values(), key=lambda e: e.sort_key())]
                 }
             }
             request["appendCells"]["rows"].append({
@@ -283,23 +602,21 @@ class ServiceReconciler:
         return {}
 
 ################################################################################
-    def _deduplicate_errors(self) -> None:
-
-        unique_errors: List[ReconcilerException] = []
-        for error in self._errors:
-            if hasattr(error, "index"):
-                qb_row_str = f"QB Row {error.index}"
-                for ue in unique_errors:
-                    if hasattr(ue, "index"):
-                        existing_qb_row_str = f"QB Row {ue.index}"
-                        if qb_row_str == existing_qb_row_str:
-                            break
-                else:
-                    unique_errors.append(error)
-            else:
-                unique_errors.append(error)
+    def _add_error(self, error: ReconcilerException) -> None:
+
+        key = error.dedup_key()
+        if key in self._errors:
+            return
+
+        self._errors[key] = error
+        self._error_counts[error.category] += 1
+
+################################################################################
+    @property
+    def error_counts(self) -> Dict[str, int]:
+        """Unique error totals by exception type."""
 
-        self._errors = list(unique_errors)
+        return dict(self._error_counts)
 
 ################################################################################
     def format_error_for_export(self, error: ReconcilerException) -> List[str]:
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import bisect
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from Utilities.Enums import ChangeKind
+from .Classes import RecordChange
+
+if TYPE_CHECKING:
+    from .SheetRecord import SheetRecord, RecordSnapshot
+    from .Spreadsheet import Spreadsheet
+    from .Worksheets.WorksheetBase import _WorksheetBase
+################################################################################
+
+__all__ = ("RecordDiff",)
+
+# Fields compared between a loaded record and its reconciled state, in the
+# order their changes are reported.
+_FIELDS: Tuple[Tuple[ChangeKind, str, Callable[[SheetRecord], Any]], ...] = (
+    (ChangeKind.Amount, "amount", lambda r: r._amount),
+    (ChangeKind.Memos, "memos", lambda r: tuple(r._memos)),
+    (ChangeKind.Names, "names", lambda r: r.name_tuples()),
+    (ChangeKind.CSR, "csr", lambda r: r.csr_tuple()),
+    (ChangeKind.Expiry, "expiry", lambda r: r._expiry_date),
+    (ChangeKind.Highlight, "highlight", lambda r: r._highlight),
+)
+
+################################################################################
+class RecordDiff:
+    """
+    Changes between the records loaded from each sheet and the same sheets
+    after reconciliation. Records are matched by content key, so the diff is a
+    single pass over each side. The longest run of loaded records still in
+    their loaded order keeps its rows; every other loaded record has moved
+    and is reported as deleted from its old row and inserted at its new one.
+    Deletions come first, bottom-up by their old row, followed by insertions,
+    field updates and rows whose loaded cells need rewriting, in new row
+    order. Patch writeback sends exactly these changes.
+    """
+
+    __slots__ = (
+        "_changes",
+    )
+
+################################################################################
+    def __init__(self, changes: List[RecordChange]) -> None:
+
+        self._changes: List[RecordChange] = changes
+
+################################################################################
+    @classmethod
+    def of_sheet(cls, sheet: _WorksheetBase) -> RecordDiff:
+
+        if not sheet._parent.tracks_changes:
+            raise ValueError("RecordDiff needs the spreadsheet to be loaded with track_changes")
+
+        # Deleted records are skipped rather than compacted away, so the
+        # sheet is left as it was
+        records = sheet.write_order()
+        snapshot = sheet._snapshot
+        origins = [snapshot[r._key].row if r._key in snapshot else None for r in records]
+        kept = {records[i]._key for i in cls._longest_increasing(origins)}
+
+        changes: List[RecordChange] = []
+
+        gone: List[Tuple[str, RecordSnapshot]] = [
+            (key, snap) for key, snap in snapshot.items() if key not in kept
+        ]
+        gone.sort(key=lambda item: item[1].row, reverse=True)
+        for key, snap in gone:
+            changes.append(RecordChange(sheet.title, ChangeKind.Delete, key, snap.row, before=snap))
+
+        # Rows as they will be written, below the title row
+        for row, record in enumerate(records, start=2):
+            if record._key not in kept:
+                changes.append(RecordChange(
+                    sheet.title, ChangeKind.Insert, record._key, row, after=record.snapshot()._replace(row=row)
+                ))
+                continue
+
+            snap = snapshot[record._key]
+            for kind, name, value in _FIELDS:
+                before, after = getattr(snap, name), value(record)
+                if before != after:
+                    changes.append(RecordChange(sheet.title, kind, record._key, row, before, after))
+
+            if record._key in sheet._stale:
+                changes.append(RecordChange(sheet.title, ChangeKind.Display, record._key, row))
+
+        return cls(changes)
+
+################################################################################
+    @classmethod
+    def of_spreadsheet(cls, spreadsheet: Spreadsheet) -> RecordDiff:
+
+        changes: List[RecordChange] = []
+        for sheet in spreadsheet._sheets:
+            changes.extend(cls.of_sheet(sheet)._changes)
+
+        return cls(changes)
+
+################################################################################
+    @staticmethod
+    def _longest_increasing(values: List[Optional[int]]) -> Set[int]:
+        """Positions of a longest strictly increasing subsequence, skipping Nones."""
+
+        tails: List[int] = []       # smallest tail value of a run of each length
+        tail_pos: List[int] = []    # position of that tail
+        prev: Dict[int, int] = {}
+
+        for pos, value in enumerate(values):
+            if value is None:
+                continue
+            k = bisect.bisect_left(tails, value)
+            if k == len(tails):
+                tails.append(value)
+                tail_pos.append(pos)
+            else:
+                tails[k] = value
+                tail_pos[k] = pos
+            if k > 0:
+                prev[pos] = tail_pos[k - 1]
+
+        result: Set[int] = set()
+        pos = tail_pos[-1] if tail_pos else None
+        while pos is not None:
+            result.add(pos)
+            pos = prev.get(pos)
+        return result
+
+################################################################################
+    @property
+    def changes(self) -> List[RecordChange]:
+
+        return self._changes
+
+################################################################################
+    def counts(self) -> Counter[ChangeKind]:
+
+        return Counter(change.kind for change in self._changes)
+
+################################################################################
+    def __len__(self) -> int:
+
+        return len(self._changes)
+
+################################################################################
+    def __iter__(self) -> Iterator[RecordChange]:
+
+        return iter(self._changes)
+
+################################################################################
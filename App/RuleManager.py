@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import List, Dict, Optional
+from bisect import bisect_left
+from typing import List, Dict, Optional, Sequence
 
 from .Classes import *
 from Database import UnitOfWork
@@ -9,17 +10,88 @@ from Utilities import Utilities as U
 
 __all__ = ("RoutingRuleManager", )
 
+DEFAULT_SHEET = "Monthly"
+
+################################################################################
+class _RoutingTable:
+    """
+    Rule list compiled into sorted amount boundaries. Each boundary value and
+    each open gap between neighbouring boundaries is resolved to the sheet of
+    the highest-priority rule covering it, so routing is a single bisect.
+    """
+
+    __slots__ = (
+        "_bounds",
+        "_point_sheets",
+        "_gap_sheets",
+    )
+
+################################################################################
+    def __init__(self, rules: Sequence[SheetRoutingRuleRead]) -> None:
+
+        # Higher priority wins; ties keep the rule list order.
+        ordered = sorted(rules, key=lambda r: -r.priority)
+
+        bounds = sorted({
+            b
+            for r in ordered
+            for b in r.bounds()
+            if b not in (float("-inf"), float("inf"))
+        })
+
+        def resolve(amount: float) -> str:
+            return next((r.sheet for r in ordered if r.contains(amount)), DEFAULT_SHEET)
+
+        self._bounds: List[float] = bounds
+        self._point_sheets: List[str] = [resolve(b) for b in bounds]
+
+        # Gap i lies between bounds[i - 1] and bounds[i] (open on both ends).
+        if bounds:
+            gap_samples = [
+                bounds[0] - 1,
+                *((lo + hi) / 2 for lo, hi in zip(bounds, bounds[1:])),
+                bounds[-1] + 1,
+            ]
+        else:
+            gap_samples = [0.0]
+        self._gap_sheets: List[str] = [resolve(x) for x in gap_samples]
+
+################################################################################
+    def route(self, amount: float) -> str:
+
+        i = bisect_left(self._bounds, amount)
+        if i < len(self._bounds) and self._bounds[i] == amount:
+            return self._point_sheets[i]
+        return self._gap_sheets[i]
+
+################################################################################
+    def route_many(self, amounts: Sequence[float]) -> List[str]:
+
+        bounds = self._bounds
+        n = len(bounds)
+        points = self._point_sheets
+        gaps = self._gap_sheets
+
+        ret: List[str] = []
+        for amount in amounts:
+            i = bisect_left(bounds, amount)
+            ret.append(points[i] if i < n and bounds[i] == amount else gaps[i])
+
+        return ret
+
 ################################################################################
 class RoutingRuleManager:
 
     __slots__ = (
         "rules",
+        "_table",
     )
 
 ################################################################################
     def __init__(self) -> None:
 
         self.rules: List[SheetRoutingRuleRead] = []
+        self._table: _RoutingTable = _RoutingTable([])
         self.refresh()
 
 ################################################################################
@@ -28,6 +100,13 @@ class RoutingRuleManager:
         with UnitOfWork() as db:
             self.rules = db._rules.list_all()
 
+        self._rebuild()
+
+################################################################################
+    def _rebuild(self) -> None:
+
+        self._table = _RoutingTable(self.rules)
+
 ################################################################################
     def list_rules(self) -> List[SheetRoutingRuleRead]:
 
@@ -43,6 +122,7 @@ class RoutingRuleManager:
             new_rule = db._rules.add(rule)
 
         self.rules.append(new_rule)
+        self._rebuild()
         return new_rule
 
 ################################################################################
@@ -61,6 +141,7 @@ class RoutingRuleManager:
                 self.rules[idx] = updated_rule
                 break
 
+        self._rebuild()
         return updated_rule
 
 ################################################################################
@@ -72,6 +153,7 @@ class RoutingRuleManager:
             db._rules.remove(rule_id)
 
         self.rules = [r for r in self.rules if r.id != rule_id]
+        self._rebuild()
 
 ################################################################################
     def add_rule(self) -> None:
@@ -123,6 +205,7 @@ class RoutingRuleManager:
         with UnitOfWork() as db:
             new_rule = db._rules.add(rule)
         self.rules.append(new_rule)
+        self._rebuild()
 
         print(f"Threshold '{name}' (${min_parsed}-${max_parsed}) added successfully.")
 
@@ -229,6 +312,7 @@ class RoutingRuleManager:
                 if r.id == rule_to_edit.id:
                     self.rules[idx] = new_rule
                     break
+            self._rebuild()
 
 ################################################################################
     def remove_rule(self) -> None:
@@ -280,6 +364,7 @@ class RoutingRuleManager:
 
                 # Update in-memory
                 self.rules = [r for r in self.rules if r.id != rule_to_remove.id]
+                self._rebuild()
 
                 print(f"Threshold '{rule_to_remove.name}' removed successfully.")
                 break
@@ -287,9 +372,12 @@ class RoutingRuleManager:
 ################################################################################
     def get_target_sheet(self, record: QBServiceRecord) -> Optional[str]:
 
-        return next(
-            (rule.sheet for rule in self.rules if rule.matches(record)),
-            "Monthly"
-        )
+        return self._table.route(abs(record.amount))
+
+################################################################################
+    def route_amounts(self, amounts: Sequence[float]) -> List[str]:
+        """Routes a batch of QB amounts at once, returning one sheet name per amount."""
+
+        return self._table.route_many([abs(a) for a in amounts])
 
 ################################################################################
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import dataclasses
+import hashlib
 from abc import abstractmethod
 from datetime import date
-from typing import TYPE_CHECKING, List, Optional, Any, Literal
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Any, Literal, Tuple
 
-from Utilities.Enums import HighlightColor
+from Utilities.Colors import Color
 from .Classes import *
 from Utilities import Utilities as U
 from .Exceptions import *
@@ -13,10 +15,27 @@ if TYPE_CHECKING:
     from .Worksheets.WorksheetBase import _WorksheetBase
 ################################################################################
 
-__all__ = ("SheetRecord", )
+__all__ = ("SheetRecord", "RecordSnapshot")
 
 LINE_SEP = ";\n"
 
+################################################################################
+class RecordSnapshot(NamedTuple):
+    """
+    A record's state as loaded, for comparison at writeback. Row data is
+    built from these fields alone, so a record whose fields still match
+    renders the same row.
+    """
+
+    row: int
+    account_id: int
+    amount: Optional[float]
+    memos: Tuple[str, ...]
+    names: Tuple[Tuple[str, Optional[str]], ...]
+    csr: Optional[Tuple[Any, ...]]
+    expiry: Optional[date]
+    highlight: Optional[Color]
+
 ################################################################################
 class SheetRecord:
 
@@ -33,6 +52,8 @@ class SheetRecord:
         "_csr_data",
         "_highlight",
         "_reconciled_record",
+        "_deleted",
+        "_key",
     )
 
 ################################################################################
@@ -49,9 +70,12 @@ class SheetRecord:
         self._amount: float = kwargs.get("amount")
         self._expiry_date: Optional[date] = kwargs.get("expiry_date")
         self._csr_data: Optional[_CSRDataBase] = kwargs.get("csr_data")
-        self._highlight: Optional[HighlightColor] = kwargs.get("highlight")
+        self._highlight: Optional[Color] = kwargs.get("highlight")
 
         self._reconciled_record: Optional[QBServiceRecord] = None
+        self._deleted: bool = False
+        # Assigned by the sheet; see content_key
+        self._key: Optional[str] = None
 
 ################################################################################
     def __eq__(self, other: SheetRecord) -> bool:
@@ -65,13 +89,62 @@ class SheetRecord:
 
 ################################################################################
     def delete(self) -> None:
+        """Marks the record as deleted. The record stays in the sheet's record
+        list until the sheet is compacted before writeback."""
+
+        if self._deleted:
+            return
+
+        self._deleted = True
+        self._sheet._on_record_deleted(self)
+
+################################################################################
+    def content_key(self) -> str:
+        """
+        Identity derived from the record's account and primary name rather than
+        the run-local _id. Records that share one are numbered by the sheet in
+        row order, so a duplicate's key depends on where it sits among the
+        others; keys are only compared within the load that assigned them.
+        """
+
+        if self._names:
+            who = f"{self._names[0].first}|{self._names[0].last or ''}".lower()
+        else:
+            who = (self._raw[0] if self._raw else "").strip().lower()
+
+        return hashlib.blake2b(f"{self._account_id}|{who}".encode("utf-8"), digest_size=8).hexdigest()
 
-        for i, record in enumerate(self._sheet._records):
-            if record == self:
-                self._sheet._records.pop(i)
-                break
+################################################################################
+    def snapshot(self) -> RecordSnapshot:
+
+        return RecordSnapshot(
+            row=self._row,
+            account_id=self._account_id,
+            amount=self._amount,
+            memos=tuple(self._memos),
+            names=self.name_tuples(),
+            csr=self.csr_tuple(),
+            expiry=self._expiry_date,
+            highlight=self._highlight,
+        )
+
+################################################################################
+    def changed_since(self, snapshot: RecordSnapshot) -> bool:
+
+        return self.snapshot()._replace(row=snapshot.row) != snapshot
 
-        # TODO: Shift indexes of remaining records up by 1
+################################################################################
+    def name_tuples(self) -> Tuple[Tuple[str, Optional[str]], ...]:
+
+        return tuple((n.first, n.last) for n in self._names)
+
+################################################################################
+    def csr_tuple(self) -> Optional[Tuple[Any, ...]]:
+        # merge() edits CSR data in place, so compare by value. The type is
+        # included since sheets lay out each kind of CSR data differently.
+        if self._csr_data is None:
+            return None
+        return type(self._csr_data).__name__, *dataclasses.astuple(self._csr_data)
 
 ################################################################################
     def to_values_array(self, sheet: str) -> List[str]:
@@ -187,6 +260,7 @@ class SheetRecord:
             self._amount = 0
         if other._amount is not None:
             self._amount += other._amount
+        self._sheet._index_amount(self)
 
         def merge_csr_text(left: str, right: str, sep: str = LINE_SEP) -> str:
             left = (left or "").strip()
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
-from typing import TYPE_CHECKING, List, Dict, Tuple, Set, Any, Optional, Literal
+from types import MappingProxyType
+from typing import TYPE_CHECKING, List, Dict, Mapping, Tuple, Set, Any, Optional, Literal
 
 from ._WorksheetFactory import _WorksheetFactory
+from .Classes import SpreadsheetMetadata
 from Utilities import Utilities as U
+from Utilities.Colors import ColorPalette
 
 if TYPE_CHECKING:
     from GClient.Client import GSheetsClient
@@ -13,8 +18,13 @@ if TYPE_CHECKING:
     from .Reconciler import ServiceReconciler
 ################################################################################
 
-__all__ = ("Spreadsheet",)
+__all__ = ("Spreadsheet", "WritebackMode", "FormatMode")
 
+WritebackMode = Literal["sequential", "concurrent", "one_shot", "patch"]
+FormatMode = Literal["inline", "runs"]
+
+# addSheet's default grid, set explicitly when the writeback is planned up front
+DEFAULT_GRID: Dict[str, int] = {"rowCount": 1000, "columnCount": 26}
 
 ################################################################################
 class Spreadsheet:
@@ -24,17 +34,35 @@ class Spreadsheet:
         "_sheets",
         "_id_counter",
         "_last_run_date",
+        "_palette",
+        "_meta",
+        "_track_changes",
     )
 
 ################################################################################
-    def __init__(self, client: GSheetsClient, payload: Dict[str, Any], last_run_date: Optional[date]) -> None:
+    def __init__(
+        self,
+        client: GSheetsClient,
+        payload: Dict[str, Any],
+        last_run_date: Optional[date],
+        *,
+        track_changes: bool = False
+    ) -> None:
+        """
+        With ``track_changes`` set, each sheet records the state its records
+        were loaded in, which patch writeback and RecordDiff compare against.
+        """
 
         self._client: GSheetsClient = client
         self._raw: Dict[str, Any] = payload
         self._last_run_date: Optional[date] = last_run_date
+        self._track_changes: bool = track_changes
 
         self._id_counter: int = 0
+        self._meta: SpreadsheetMetadata = self._load_metadata()
+        self._palette: ColorPalette = ColorPalette(self._meta.theme_colors)
 
+        relevant = self.relevant_sheets()
         self._sheets: List[_WorksheetBase] = [
             _WorksheetFactory.create(
                 client=self._client,
@@ -42,7 +70,7 @@ class Spreadsheet:
                 payload=sheet
             )
             for sheet in self._raw.get("sheets", [])
-            if sheet["properties"]["title"] in self.relevant_sheets()
+            if sheet["properties"]["title"] in relevant
         ]
         print(f"Loaded {len(self._sheets)} relevant sheets from spreadsheet.")
 
@@ -63,7 +91,7 @@ class Spreadsheet:
     @property
     def id(self) -> str:
 
-        return self._raw["spreadsheetId"]
+        return self._meta.id
 
 ################################################################################
     @property
@@ -74,10 +102,13 @@ class Spreadsheet:
 ################################################################################
     def relevant_sheets(self, *, add_suffix: bool = True) -> Set[str]:
 
-        if add_suffix:
-            suffix = f" - {self._last_run_date.strftime('%m-%d-%Y')}" if self._last_run_date else ""
-        else:
-            suffix = ""
+        return self.relevant_titles(self._last_run_date if add_suffix else None)
+
+################################################################################
+    @staticmethod
+    def relevant_titles(last_run_date: Optional[date]) -> Set[str]:
+
+        suffix = f" - {last_run_date.strftime('%m-%d-%Y')}" if last_run_date else ""
         return {
             f"Annual{suffix}",
             f"Monthly{suffix}",
@@ -88,13 +119,56 @@ class Spreadsheet:
 
 ################################################################################
     @property
-    def theme_colors(self) -> Dict[str, Dict[str, float]]:
+    def theme_colors(self) -> Mapping[str, Mapping[str, float]]:
 
-        return {
-            x["colorType"]: x["color"]["rgbColor"]
-            for x
-            in self.properties.get("spreadsheetTheme", {}).get("themeColors", {})
-        }
+        return self._meta.theme_colors
+
+################################################################################
+    @property
+    def metadata(self) -> SpreadsheetMetadata:
+
+        return self._meta
+
+################################################################################
+    def _load_metadata(self) -> SpreadsheetMetadata:
+        """Decodes the payload's properties once, into read-only tables."""
+
+        properties = self.properties
+        return SpreadsheetMetadata(
+            id=self._raw["spreadsheetId"],
+            title=properties.get("title", ""),
+            theme_colors=MappingProxyType({
+                x["colorType"]: MappingProxyType(x["color"]["rgbColor"])
+                for x
+                in properties.get("spreadsheetTheme", {}).get("themeColors", {})
+            }),
+            sheet_ids=MappingProxyType({
+                sheet["properties"]["title"]: sheet["properties"].get("sheetId")
+                for sheet
+                in self._raw.get("sheets", [])
+            }),
+        )
+
+################################################################################
+    def invalidate_metadata(self) -> None:
+        """Re-reads the metadata of the spreadsheet and its sheets after their payloads change."""
+
+        self._meta = self._load_metadata()
+        self._palette.load_themes(self._meta.theme_colors)
+        for sheet in self._sheets:
+            sheet.invalidate_metadata()
+
+################################################################################
+    @property
+    def tracks_changes(self) -> bool:
+
+        return self._track_changes
+
+################################################################################
+    @property
+    def palette(self) -> ColorPalette:
+
+        return self._palette
 
 ################################################################################
     def new_id(self) -> int:
@@ -103,7 +177,290 @@ class Spreadsheet:
         return self._id_counter
 
 ################################################################################
-    def final_batch_update(self, reconciler: ServiceReconciler, date_str: str) -> None:
+    def final_batch_update(
+        self,
+        reconciler: ServiceReconciler,
+        date_str: str,
+        *,
+        mode: WritebackMode = "sequential",
+        max_workers: Optional[int] = None,
+        formats: FormatMode = "inline"
+    ) -> List[Dict[str, Any]]:
+        """
+        Writes the reconciled tabs and returns the new worksheet tabs' properties.
+
+        ``mode`` selects how the requests are sent:
+            * "sequential" - create the tabs, then send content, trims, the
+              error sheet and the summary one after another.
+            * "concurrent" - once the tabs exist, send each worksheet's content
+              as its own batchUpdate on a worker pool (the client's rate limiter
+              still applies), alongside the error sheet, then the summary.
+            * "one_shot" - pick the new tabs' sheetIds up front and send the
+              whole writeback as a single (chunked) batchUpdate.
+            * "patch" - as "one_shot", but tabs written by a previous run are
+              copied with duplicateSheet and only their changed rows are sent.
+              The copies read back like fresh tabs, but untouched rows keep
+              formatting the app doesn't load, such as bold text. Only sheets
+              loaded with ``track_changes`` can be patched.
+
+        ``formats`` selects how new tabs' cells are formatted: "inline" sends
+        each cell's format with its value, "runs" appends values only and
+        formats runs of matching cells with repeatCell.
+        """
+
+        if mode in ("one_shot", "patch"):
+            return self._one_shot_batch_update(reconciler, date_str, patch=mode == "patch", formats=formats)
+        concurrent = mode == "concurrent"
+
+        new_sheet_ids, new_sheet_grid_props, new_tabs = self._create_tabs(date_str)
+        print(f"Creating new sheets completed.")
+
+        sheet_requests: List[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = []
+        for sheet in self._sheets:
+            new_sheet_title = f"{sheet.base_title()} - {date_str}"
+            sheet_requests.append(
+                self._sheet_requests(
+                    sheet,
+                    new_sheet_ids[new_sheet_title],
+                    new_sheet_grid_props[new_sheet_title],
+                    formats=formats
+                )
+            )
+            print(f"Appending data to sheet '{new_sheet_title}'...")
+
+        if concurrent:
+            # Pull in every sheet's errors before the error sheet job starts
+            reconciler.format_all_errors(None)
+            workers = max_workers or len(sheet_requests) + 1
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writeback") as pool:
+                futures = [
+                    pool.submit(self._client.batch_update_chunked, self.id, requests + trims)
+                    for requests, trims in sheet_requests
+                ]
+                futures.append(pool.submit(self._write_error_sheet, reconciler, date_str))
+                for future in as_completed(futures):
+                    future.result()
+        else:
+            self._client.batch_update_chunked(self.id, [r for requests, _ in sheet_requests for r in requests])
+
+            # Execute trimming requests
+            trim_requests = [t for _, trims in sheet_requests for t in trims]
+            if trim_requests:
+                print(f"Trimming excess rows and columns...")
+                self._client.batch_update_spreadsheet(
+                    self.id,
+                    {"requests": trim_requests}
+                )
+
+            # Call this after the sheets to ensure we've collected all errors from all sheets first.
+            reconciler.format_all_errors(None)
+            self._write_error_sheet(reconciler, date_str)
+
+        # Add data to the summary sheet for totals
+        summary_sheet_id = new_sheet_ids[f"Summary - {date_str}"]
+        summary_requests = self._summary_sheet_requests(summary_sheet_id, date_str, len(reconciler._errors) or None)
+        print(f"Appending data to sheet 'Summary'...")
+        self._client.batch_update_spreadsheet(
+            self.id,
+            {"requests": list(summary_requests)}
+        )
+
+        return new_tabs
+
+################################################################################
+    def _one_shot_batch_update(
+        self,
+        reconciler: ServiceReconciler,
+        date_str: str,
+        *,
+        patch: bool = False,
+        formats: FormatMode = "inline"
+    ) -> List[Dict[str, Any]]:
+
+        reconciler.format_all_errors(None)
+        has_errors = len(reconciler._errors) > 0
+
+        if patch and not self._track_changes:
+            print("Sheets were loaded without change tracking. Writing every sheet in full.")
+        patched = [patch and sheet.can_patch for sheet in self._sheets]
+        titles = [f"{sheet.base_title()} - {date_str}" for sheet in self._sheets]
+        titles.append(f"Summary - {date_str}")
+        if has_errors:
+            titles.append(f"Parsing Errors - {date_str}")
+        sheet_ids = self._planned_sheet_ids(titles, self._all_sheet_ids())
+
+        create_requests: List[Dict[str, Any]] = []
+        for sheet, is_patched in zip(self._sheets, patched):
+            if is_patched:
+                create_requests.append(self._duplicate_sheet_request(sheet, date_str, sheet_ids))
+            else:
+                create_requests.append(sheet.create_new_sheet_request(date_str))
+        create_requests.append(self._add_summary_sheet_request(date_str))
+        if has_errors:
+            create_requests.append(self.create_error_sheet_request(date_str))
+
+        for request in create_requests:
+            if "addSheet" in request:
+                props = request["addSheet"]["properties"]
+                props["sheetId"] = sheet_ids[props["title"]]
+                props["gridProperties"] = dict(DEFAULT_GRID)
+
+        requests: List[Dict[str, Any]] = list(create_requests)
+        trim_requests: List[Dict[str, Any]] = []
+        new_tabs: List[Dict[str, Any]] = []
+        for sheet, is_patched, new_sheet_title in zip(self._sheets, patched, titles):
+            new_sheet_id = sheet_ids[new_sheet_title]
+            if is_patched:
+                requests.extend(self._patch_sheet_requests(sheet, new_sheet_id))
+            else:
+                content, trims = self._sheet_requests(sheet, new_sheet_id, DEFAULT_GRID, formats=formats)
+                requests.extend(content)
+                trim_requests.extend(trims)
+            new_tabs.append({"title": new_sheet_title, "sheetId": new_sheet_id, "gridProperties": dict(DEFAULT_GRID)})
+        requests.extend(trim_requests)
+
+        if has_errors:
+            requests.append(reconciler.format_all_errors(sheet_ids[f"Parsing Errors - {date_str}"]))
+
+        requests.extend(
+            self._summary_sheet_requests(
+                sheet_ids[f"Summary - {date_str}"],
+                date_str,
+                len(reconciler._errors) or None
+            )
+        )
+
+        if any(patched):
+            print(f"Patching {sum(patched)} of {len(self._sheets)} sheets from their previous tabs...")
+        print(f"Writing {len(self._sheets)} sheets in one batch update...")
+        self._client.batch_update_chunked(self.id, requests)
+
+        return new_tabs
+
+################################################################################
+    @staticmethod
+    def _duplicate_sheet_request(sheet: _WorksheetBase, date_str: str, sheet_ids: Dict[str, int]) -> Dict[str, Any]:
+
+        title = f"{sheet.base_title()} - {date_str}"
+        return {
+            "duplicateSheet": {
+                "sourceSheetId": sheet.id,
+                "newSheetId": sheet_ids[title],
+                "newSheetName": title,
+            }
+        }
+
+################################################################################
+    def _patch_sheet_requests(self, sheet: _WorksheetBase, new_sheet_id: int) -> List[Dict[str, Any]]:
+        """
+        Brings a server-side copy of the sheet's previous tab in line with
+        what _sheet_requests would write to a fresh tab: the result reads back
+        the same through the fields the app loads, with the same grid size
+        and column widths. The copy is first widened to a fresh tab's width
+        and everything right of RELEVANT_COLS is cleared, so the title row
+        and the usual trims apply unchanged.
+        """
+
+        column_count = max(DEFAULT_GRID["columnCount"], sheet.grid_properties.get("columnCount", 0))
+        width = U.column_to_index(sheet.relevant_col_end)
+        requests = [
+            self._grid_size_request(new_sheet_id, columnCount=column_count),
+            {
+                "updateCells": {
+                    # No rows, so every cell in the range is cleared
+                    "range": {
+                        "sheetId": new_sheet_id,
+                        "startColumnIndex": width,
+                        "endColumnIndex": column_count,
+                    },
+                    "fields": "*",
+                }
+            },
+        ]
+
+        title = self.title_row_payload(new_sheet_id, sheet.title)["appendCells"]
+        requests.append({
+            "updateCells": {
+                "range": {
+                    "sheetId": new_sheet_id,
+                    "startRowIndex": 0,
+                    "endRowIndex": 1,
+                    "startColumnIndex": 0,
+                    "endColumnIndex": len(title["rows"][0]["values"]),
+                },
+                "rows": title["rows"],
+                "fields": title["fields"],
+            }
+        })
+        requests.extend(sheet.patch_requests(new_sheet_id))
+        requests.extend(sheet.column_sizing_requests(new_sheet_id))
+        requests.extend(sheet.justification_requests(new_sheet_id))
+
+        # The patched rows end at the last record, where a fresh tab would have
+        # its default height (or more, if appending grew it).
+        row_count = max(DEFAULT_GRID["rowCount"], sheet.record_count + 1)
+        requests.append(self._grid_size_request(new_sheet_id, rowCount=row_count))
+        requests.extend(
+            sheet.trim_requests(
+                new_sheet_id,
+                trim_rows=sheet.max_row < 1000,
+                row_count=DEFAULT_GRID["rowCount"],
+                record_count=sheet.record_count,
+                column_count=column_count,
+            )
+        )
+
+        return requests
+
+################################################################################
+    @staticmethod
+    def _grid_size_request(sheet_id: int, **grid: int) -> Dict[str, Any]:
+
+        return {
+            "updateSheetProperties": {
+                "properties": {"sheetId": sheet_id, "gridProperties": grid},
+                "fields": ",".join(f"gridProperties.{key}" for key in grid),
+            }
+        }
+
+################################################################################
+    def _all_sheet_ids(self) -> Set[int]:
+        """
+        The sheetIds of every tab in the spreadsheet. The loaded payload only
+        covers the relevant tabs, so the rest (Summary, Parsing Errors, older
+        dated tabs...) are fetched with a properties-only request.
+        """
+
+        resp = self._client.spreadsheet_get(self.id, fields="sheets.properties(sheetId)")
+        return {
+            sheet["properties"]["sheetId"]
+            for sheet in resp.get("sheets", [])
+        } | set(self._meta.sheet_ids.values())
+
+################################################################################
+    @staticmethod
+    def _planned_sheet_ids(titles: List[str], taken: Set[int]) -> Dict[str, int]:
+        """
+        Deterministic sheetIds for the tabs a writeback creates, so content
+        requests can target them in the same batchUpdate as the addSheets.
+        Titles are dated and unique, so their hashes are unlikely to collide
+        with any existing tab; the IDs in ``taken`` are skipped regardless.
+        """
+
+        taken = set(taken)
+        ids: Dict[str, int] = {}
+
+        for title in titles:
+            candidate = zlib.crc32(title.encode("utf-8")) & 0x7FFFFFFF
+            while candidate == 0 or candidate in taken:
+                candidate = (candidate + 1) & 0x7FFFFFFF
+            taken.add(candidate)
+            ids[title] = candidate
+
+        return ids
+
+################################################################################
+    def _create_tabs(self, date_str: str) -> Tuple[Dict[str, int], Dict[str, Any], List[Dict[str, Any]]]:
 
         create_sheets_payload = {"requests": []}
         # Create new tabs first
@@ -126,51 +483,52 @@ class Spreadsheet:
             if "addSheet" in x
         }
         print(new_sheet_grid_props)
+        new_tabs: List[Dict[str, Any]] = [
+            x["addSheet"]["properties"]
+            for x
+            in resp.get("replies", [])
+            if "addSheet" in x and not x["addSheet"]["properties"]["title"].startswith("Summary")
+        ]
 
-        print(f"Creating new sheets completed.")
+        return new_sheet_ids, new_sheet_grid_props, new_tabs
 
-        requests = []
-        trim_requests = []
-        for sheet in self._sheets:
-            new_sheet_title = f"{sheet.base_title()} - {date_str}"
+################################################################################
+    def _sheet_requests(
+        self,
+        sheet: _WorksheetBase,
+        new_sheet_id: int,
+        grid_props: Dict[str, Any],
+        *,
+        formats: FormatMode = "inline"
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """A worksheet's content requests and the trims that must follow them."""
+
+        requests = [
             # Title row
-            requests.append(self.title_row_payload(new_sheet_ids[new_sheet_title], sheet.title))
-            # Append cells
-            requests.append(sheet.append_cells_payload(new_sheet_ids[new_sheet_title]))
-            # Column sizing
-            requests.extend(sheet.column_sizing_requests(new_sheet_ids[new_sheet_title]))
-            # Horizontal justification
-            requests.extend(sheet.justification_requests(new_sheet_ids[new_sheet_title]))
-            # Trim excess rows and columns
-            trim_requests.extend(
-                sheet.trim_requests(
-                    new_sheet_ids[new_sheet_title],
-                    trim_rows=sheet.max_row < 1000,
-                    row_count=new_sheet_grid_props[new_sheet_title]["rowCount"],
-                    record_count=len(sheet._records),
-                    column_count=new_sheet_grid_props[new_sheet_title]["columnCount"],
-                )
-            )
-
-            print(f"Appending data to sheet '{new_sheet_title}'...")
+            self.title_row_payload(new_sheet_id, sheet.title),
+        ]
+        # Append cells
+        requests.extend(sheet.append_cells_requests(new_sheet_id, formats=formats))
+        # Column sizing
+        requests.extend(sheet.column_sizing_requests(new_sheet_id))
+        # Horizontal justification
+        requests.extend(sheet.justification_requests(new_sheet_id))
+
+        # Trim excess rows and columns
+        trims = sheet.trim_requests(
+            new_sheet_id,
+            trim_rows=sheet.max_row < 1000,
+            row_count=grid_props["rowCount"],
+            record_count=sheet.record_count,
+            column_count=grid_props["columnCount"],
+        )
 
-        bulk_update_request = {
-            "requests": requests,
-            "includeSpreadsheetInResponse": False
-        }
-        self._client.batch_update_spreadsheet(self.id, bulk_update_request)
+        return requests, trims
 
-        # Execute trimming requests
-        if trim_requests:
-            print(f"Trimming excess rows and columns...")
-            self._client.batch_update_spreadsheet(
-                self.id,
-                {"requests": trim_requests}
-            )
+################################################################################
+    def _write_error_sheet(self, reconciler: ServiceReconciler, date_str: str) -> None:
+        """Writes the collected errors list to its own tab, if there are any."""
 
-        # Write final errors list to error sheet.
-        # Call this outside the loop to ensure we've collected all errors from all sheets first.
-        reconciler.format_all_errors(None)
         if len(reconciler._errors) > 0:
             print(f"Creating sheet 'Parsing Errors'...")
             resp = self._client.batch_update_spreadsheet(
@@ -179,22 +537,7 @@ class Spreadsheet:
             )
             error_sheet_id = resp["replies"][0]["addSheet"]["properties"]["sheetId"]
             print(f"Appending data to sheet 'Parsing Errors'...")
-            self._client.batch_update_spreadsheet(
-                self.id,
-                body={
-                    "requests": reconciler.format_all_errors(error_sheet_id),
-                    "includeSpreadsheetInResponse": False
-                },
-            )
-
-        # Add data to the summary sheet for totals
-        summary_sheet_id = new_sheet_ids[f"Summary - {date_str}"]
-        summary_requests = self._summary_sheet_requests(summary_sheet_id, date_str, len(reconciler._errors) or None)
-        print(f"Appending data to sheet 'Summary'...")
-        self._client.batch_update_spreadsheet(
-            self.id,
-            {"requests": list(summary_requests)}
-        )
+            self._client.batch_update_chunked(self.id, [reconciler.format_all_errors(error_sheet_id)])
 
 ################################################################################
     @staticmethod
@@ -41,13 +41,9 @@ class DuctCleaningWorksheet(_WorksheetBase):
             self._errors.append(NumericParseError(self.title, row[2]["formattedValue"], row_index))
             return
 
-        accounting_highlight = row[0]["effectiveFormat"]["backgroundColorStyle"].get("rgbColor")
-        if accounting_highlight is None:
-            accounting_highlight = self._parent.theme_colors[row[0]["effectiveFormat"]["backgroundColorStyle"]["themeColor"]]
+        accounting_highlight = self._parent.palette.resolve(row[0]["effectiveFormat"]["backgroundColorStyle"])
 
-        csr_highlight = row[3]["effectiveFormat"]["backgroundColorStyle"].get("rgbColor")
-        if csr_highlight is None:
-            csr_highlight = self._parent.theme_colors[row[3]["effectiveFormat"]["backgroundColorStyle"]["themeColor"]]
+        csr_highlight = self._parent.palette.resolve(row[3]["effectiveFormat"]["backgroundColorStyle"])
 
         return SheetRecord(
             self,
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import List, Union, Optional, Any, Dict
 
 from Utilities import Utilities as U
+from Utilities.Colors import WHITE
 from .WorksheetBase import _WorksheetBase
 from ..Classes import *
 from ..Exceptions import *
@@ -41,9 +42,7 @@ class GeneratorWorksheet(_WorksheetBase):
             self._errors.append(NumericParseError(self.title, row[2]["formattedValue"], row_index))
             return
 
-        accounting_highlight = row[0]["effectiveFormat"]["backgroundColorStyle"].get("rgbColor")
-        if accounting_highlight is None:
-            accounting_highlight = self._parent.theme_colors[row[0]["effectiveFormat"]["backgroundColorStyle"]["themeColor"]]
+        accounting_highlight = self._parent.palette.resolve(row[0]["effectiveFormat"]["backgroundColorStyle"])
 
         return SheetRecord(
             self,
@@ -56,11 +55,7 @@ class GeneratorWorksheet(_WorksheetBase):
             expiry_date=None,
             csr_data=_CSRDataBase(
                 raw=[x.get("formattedValue", "") for x in row[5:]],
-                highlight={
-                    "red": 1.0,
-                    "green": 1.0,
-                    "blue": 1.0
-                },
+                highlight=WHITE,
             ),
             highlight=accounting_highlight
         )
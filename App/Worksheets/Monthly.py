@@ -45,13 +45,9 @@ class MonthlyWorksheet(_WorksheetBase):
             self._errors.append(NumericParseError(self.title, row[2]["formattedValue"], row_index))
             return
 
-        accounting_highlight = row[0]["effectiveFormat"]["backgroundColorStyle"].get("rgbColor")
-        if accounting_highlight is None:
-            accounting_highlight = self._parent.theme_colors[row[0]["effectiveFormat"]["backgroundColorStyle"]["themeColor"]]
+        accounting_highlight = self._parent.palette.resolve(row[0]["effectiveFormat"]["backgroundColorStyle"])
 
-        csr_highlight = row[4]["effectiveFormat"]["backgroundColorStyle"].get("rgbColor")
-        if csr_highlight is None:
-            csr_highlight = self._parent.theme_colors[row[4]["effectiveFormat"]["backgroundColorStyle"]["themeColor"]]
+        csr_highlight = self._parent.palette.resolve(row[4]["effectiveFormat"]["backgroundColorStyle"])
 
         return SheetRecord(
             self,
@@ -135,6 +131,7 @@ class MonthlyWorksheet(_WorksheetBase):
 
         record = acct_records[0]
         record._amount += qb.amount
+        self._index_amount(record)
 
         print(f"    Updated record after reconciliation: {record}")
         return True
@@ -231,11 +228,7 @@ class MonthlyWorksheet(_WorksheetBase):
                 # Empty - Purple Highlight
                 self.value_with_highlight(
                     value="",
-                    color={
-                        "red": 0.40392157,
-                        "green": 0.30588236,
-                        "blue": 0.654902
-                    }
+                    color=self.EMPTY_COLUMN_COLOR
                 ),
                 # CSR Data (if applicable)
                 *csr_data
@@ -247,6 +240,9 @@ class MonthlyWorksheet(_WorksheetBase):
 
         for i, r in enumerate(self._records):
             if r._id == record._id:
+                record._key = r._key
+                self._unindex_record(r)
                 self._records[i] = record
+                self._index_record(record)
 
 ################################################################################
@@ -42,13 +42,9 @@ class PlumbingWorksheet(_WorksheetBase):
             self._errors.append(NumericParseError(self.title, row[2]["formattedValue"], row_index))
             return
 
-        accounting_highlight = row[0]["effectiveFormat"]["backgroundColorStyle"].get("rgbColor")
-        if accounting_highlight is None:
-            accounting_highlight = self._parent.theme_colors[row[0]["effectiveFormat"]["backgroundColorStyle"]["themeColor"]]
+        accounting_highlight = self._parent.palette.resolve(row[0]["effectiveFormat"]["backgroundColorStyle"])
 
-        csr_highlight = row[5].get("effectiveFormat", {}).get("backgroundColorStyle", {}).get("rgbColor")
-        if csr_highlight is None:
-            csr_highlight = self._parent.theme_colors[row[5]["effectiveFormat"]["backgroundColorStyle"]["themeColor"]]
+        csr_highlight = self._parent.palette.resolve(row[5].get("effectiveFormat", {}).get("backgroundColorStyle", {}))
 
         return SheetRecord(
             self,
@@ -143,11 +139,7 @@ class PlumbingWorksheet(_WorksheetBase):
                 # Empty - Purple Highlight
                 self.value_with_highlight(
                     value="",
-                    color={
-                        "red": 0.40392157,
-                        "green": 0.30588236,
-                        "blue": 0.654902
-                    }
+                    color=self.EMPTY_COLUMN_COLOR
                 ),
                 # CSR Data (if applicable)
                 *csr_data
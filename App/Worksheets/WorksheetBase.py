@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import heapq
+import json
 import re
 from abc import ABC, abstractmethod
 from datetime import timedelta, datetime
-from typing import Optional, Mapping, Tuple
+from types import MappingProxyType
+from typing import Iterable, Optional, Mapping, Set, Tuple
 
 from Utilities import Utilities as U
+from Utilities.Colors import WHITE, Color
+from Utilities.Enums import ChangeKind
 from ..Exceptions import *
-from ..SheetRecord import SheetRecord
-from App.Classes import MemberName
+from ..RecordDiff import RecordDiff
+from ..SheetRecord import RecordSnapshot, SheetRecord
+from App.Classes import MemberName, WorksheetMetadata
 
 if TYPE_CHECKING:
     from GClient.Client import GSheetsClient
-    from App.Spreadsheet import Spreadsheet
+    from App.Spreadsheet import FormatMode, Spreadsheet
     from App.Classes import ServiceAccountRecord
 ################################################################################
 
@@ -28,12 +34,22 @@ class _WorksheetBase(ABC):
         "_parent",
         "_raw",
         "_data",
+        "_meta",
         "_records",
+        "_by_account",
+        "_by_amount",
+        "_dead_count",
+        "_max_row",
+        "_snapshot",
+        "_stale",
+        "_key_counts",
         "_errors",
         "_reconciled",
     )
 
     RELEVANT_COLS: str = None  # type: ignore
+    # Purple fill of the empty column between the record and its CSR data
+    EMPTY_COLUMN_COLOR: Color = Color(0x674EA7)
 
 ################################################################################
     def __init__(self, client: GSheetsClient, parent: Spreadsheet, payload: Dict[str, Any]) -> None:
@@ -44,17 +60,27 @@ class _WorksheetBase(ABC):
         self._parent: Spreadsheet = parent
         self._raw: Dict[str, Any] = payload.copy()
         self._data: Dict[str, Any] = payload["data"][0]
+        self._meta: WorksheetMetadata = self._load_metadata()
         self._errors: List[ReconcilerException] = []
         self._reconciled: List[SheetRecord] = []
 
         self._records: List[SheetRecord] = []
+        self._by_account: Dict[int, List[SheetRecord]] = {}
+        self._by_amount: Dict[Tuple[int, int], List[Tuple[int, int, SheetRecord]]] = {}
+        self._dead_count: int = 0
+        self._max_row: int = 0
+        # Content key -> state of the record as loaded
+        self._snapshot: Dict[str, RecordSnapshot] = {}
+        # Content keys of records whose loaded cells don't show what they render
+        self._stale: Set[str] = set()
+        self._key_counts: Dict[str, int] = {}
         self._parse_row_data()
 
 ################################################################################
     @property
     def id(self) -> int:
 
-        return self.properties["sheetId"]
+        return self._meta.sheet_id
 
 ################################################################################
     @property
@@ -78,7 +104,41 @@ class _WorksheetBase(ABC):
     @property
     def title(self) -> str:
 
-        return self.properties["title"]
+        return self._meta.title
+
+################################################################################
+    @property
+    def grid_properties(self) -> Mapping[str, Any]:
+
+        return self._meta.grid_properties
+
+################################################################################
+    @property
+    def metadata(self) -> WorksheetMetadata:
+
+        return self._meta
+
+################################################################################
+    def _load_metadata(self) -> WorksheetMetadata:
+        """Decodes the tab's properties and column metadata once, into read-only tables."""
+
+        properties = self.properties
+        return WorksheetMetadata(
+            sheet_id=properties.get("sheetId"),
+            title=properties["title"],
+            base_title=_DATE_SUFFIX_RE.sub("", properties["title"]).strip(),
+            grid_properties=MappingProxyType(dict(properties.get("gridProperties", {}))),
+            column_sizes=MappingProxyType({
+                i: x["pixelSize"]
+                for i, x
+                in enumerate(self._data.get("columnMetadata", []))
+            }),
+        )
+
+################################################################################
+    def invalidate_metadata(self) -> None:
+
+        self._meta = self._load_metadata()
 
 ################################################################################
     def with_date_string(self, date_str: str) -> str:
@@ -86,24 +146,24 @@ class _WorksheetBase(ABC):
         return f"{self.title} - {date_str}"
 
 ################################################################################
-    def column_sizes(self) -> Dict[int, int]:
+    def column_sizes(self) -> Mapping[int, int]:
 
-        return {
-            i: x["pixelSize"]
-            for i, x
-            in enumerate(self._data["columnMetadata"])
-        }
+        return self._meta.column_sizes
 
 ################################################################################
     @property
     def max_row(self) -> int:
         """Returns the last row index that contains data."""
 
-        return next(
-            # This is the first empty row, so subtract 1 for last row with data.
-            (record._row - 1 for record in self._records if record.is_empty()),
-            len(self._records)
-        )
+        # Seeded by _parse_row_data and kept current by add_row and deletions.
+        return self._max_row
+
+################################################################################
+    @property
+    def record_count(self) -> int:
+        """Returns the number of records that have not been deleted."""
+
+        return len(self._records) - self._dead_count
 
 ################################################################################
     def next_row(self) -> int:
@@ -144,7 +204,7 @@ class _WorksheetBase(ABC):
 ################################################################################
     def base_title(self) -> str:
 
-        return _DATE_SUFFIX_RE.sub("", self.title).strip()
+        return self._meta.base_title
 
 ################################################################################
     def create_new_sheet_request(self, date_str: str) -> Dict[str, Any]:
@@ -158,24 +218,136 @@ class _WorksheetBase(ABC):
         }
 
 ################################################################################
-    def append_cells_payload(self, sheet_id: int):
+    def compact(self) -> None:
+        """
+        Drops deleted records and renumbers the survivors in the order they
+        will be written, starting below the title row. This is done once per
+        run instead of on every deletion.
+        """
+        live = self.write_order()
+
+        for i, record in enumerate(live, start=2):
+            record._row = i
 
-        sorted_records = sorted(self._records, key=lambda r: (
+        self._records = live
+        self._dead_count = 0
+        self._max_row = self._scan_max_row()
+
+################################################################################
+    def write_order(self) -> List[SheetRecord]:
+        """The live records in the order compact() puts them in, without changing anything."""
+
+        live = [r for r in self._records if not r._deleted]
+        live.sort(key=lambda r: (
             r._expiry_date is not None,
             r._expiry_date or datetime.min,
             r._row
         ))
+        return live
+
+################################################################################
+    def append_cells_payload(self, sheet_id: int):
+
+        self.compact()
 
         ret = {
             "appendCells": {
                 "sheetId": sheet_id,
                 "fields": "*",
-                "rows": [r.to_row_data() for r in sorted_records]
+                "rows": [r.to_row_data() for r in self._records]
             }
         }
 
         return ret
 
+################################################################################
+    def append_cells_requests(self, sheet_id: int, *, formats: FormatMode = "inline") -> List[Dict[str, Any]]:
+        """
+        The records as appendCells, formatted per cell ("inline") or followed
+        by repeatCell requests that format runs of matching cells ("runs").
+        Records are appended below the title row.
+        """
+
+        payload = self.append_cells_payload(sheet_id)
+        if formats == "inline":
+            return [payload]
+
+        rows = payload["appendCells"]["rows"]
+        payload["appendCells"]["fields"] = "userEnteredValue"
+        payload["appendCells"]["rows"] = [
+            {"values": [{"userEnteredValue": cell.get("userEnteredValue", {})} for cell in row["values"]]}
+            for row in rows
+        ]
+
+        return [payload, *self.format_run_requests(sheet_id, rows, start_row=1)]
+
+################################################################################
+    @staticmethod
+    def format_run_requests(sheet_id: int, rows: List[Dict[str, Any]], *, start_row: int) -> List[Dict[str, Any]]:
+        """
+        One repeatCell per rectangle of cells sharing a userEnteredFormat.
+        Each row is split into runs of adjacent columns with the same format,
+        and a run continues down the rows for as long as the row below has the
+        same run. Cells without a format are left alone.
+        """
+
+        # Interned formats, so runs compare by index
+        palette: Dict[str, int] = {}
+        formats: List[Dict[str, Any]] = []
+
+        # (start col, end col, format index) -> first row of the open run
+        open_runs: Dict[Tuple[int, int, int], int] = {}
+        # (start row, end row, start col, end col, format index)
+        closed: List[Tuple[int, int, int, int, int]] = []
+
+        row_index = start_row
+        for row_index, row in enumerate(rows, start=start_row):
+            cells = row["values"]
+            segments: List[Tuple[int, int, int]] = []
+
+            for col, cell in enumerate(cells):
+                fmt = cell.get("userEnteredFormat")
+                if fmt is None:
+                    continue
+                key = json.dumps(fmt, sort_keys=True, separators=(",", ":"))
+                index = palette.get(key)
+                if index is None:
+                    index = palette[key] = len(formats)
+                    formats.append(fmt)
+
+                last = segments[-1] if segments else None
+                if last is not None and last[1] == col and last[2] == index:
+                    segments[-1] = (last[0], col + 1, index)
+                else:
+                    segments.append((col, col + 1, index))
+
+            still_open = {segment: open_runs.pop(segment, row_index) for segment in segments}
+            for (c0, c1, index), r0 in open_runs.items():
+                closed.append((r0, row_index, c0, c1, index))
+            open_runs = still_open
+
+        end_row = row_index + 1
+        for (c0, c1, index), r0 in open_runs.items():
+            closed.append((r0, end_row, c0, c1, index))
+        closed.sort()
+
+        return [
+            {
+                "repeatCell": {
+                    "range": {
+                        "sheetId": sheet_id,
+                        "startRowIndex": r0,
+                        "endRowIndex": r1,
+                        "startColumnIndex": c0,
+                        "endColumnIndex": c1,
+                    },
+                    "cell": {"userEnteredFormat": formats[index]},
+                    "fields": "userEnteredFormat",
+                }
+            }
+            for r0, r1, c0, c1, index in closed
+        ]
+
 ################################################################################
     def new_id(self) -> int:
 
@@ -198,6 +370,130 @@ class _WorksheetBase(ABC):
 
             assert isinstance(result, SheetRecord), "Parsed record must be a SheetRecord"
             self._records.append(result)
+            self._assign_key(result)
+            self._index_record(result)
+            if self._parent.tracks_changes and not self._reads_back(values, result):
+                self._stale.add(result._key)
+
+        self._max_row = self._scan_max_row()
+        if self._parent.tracks_changes:
+            self._snapshot = {record._key: record.snapshot() for record in self._records}
+
+################################################################################
+    def _assign_key(self, record: SheetRecord) -> None:
+        """
+        Gives the record its content key, numbering repeats in the order they
+        are added. The key stays with the record for the rest of the run.
+        """
+
+        if not self._parent.tracks_changes:
+            return
+
+        base = record.content_key()
+        seen = self._key_counts.get(base, 0)
+        self._key_counts[base] = seen + 1
+        record._key = base if seen == 0 else f"{base}#{seen}"
+
+################################################################################
+    def _reads_back(self, values: List[Mapping[str, Any]], record: SheetRecord) -> bool:
+        """
+        Whether the loaded cells show exactly what the record renders, so a
+        copy of the tab can keep its row. Users recolor single cells and type
+        over columns the record doesn't parse, and those rows have to be
+        rewritten even when the record itself is unchanged.
+        """
+
+        palette = self._parent.palette
+        for fetched, cell in zip(values, record.to_row_data()["values"]):
+            shown = fetched.get("formattedValue", "")
+            value = cell["userEnteredValue"]
+            if "number_value" in value:
+                # Written as text, shown with the currency pattern
+                success, number = U.make_numeric(shown, default=None)
+                if not success or number != U.make_numeric(value["number_value"], default=None)[1]:
+                    return False
+            elif shown != value.get("stringValue", ""):
+                return False
+
+            style = fetched.get("effectiveFormat", {}).get("backgroundColorStyle")
+            rendered = cell.get("userEnteredFormat", {}).get("backgroundColorStyle")
+            if (palette.resolve(style) if style else WHITE) != (palette.resolve(rendered) if rendered else WHITE):
+                return False
+
+        return True
+
+################################################################################
+    def _scan_max_row(self) -> int:
+
+        return next(
+            # This is the first empty row, so subtract 1 for last row with data.
+            (
+                record._row - 1
+                for record in self._records
+                if not record._deleted and record.is_empty()
+            ),
+            self.record_count
+        )
+
+################################################################################
+    def _index_record(self, record: SheetRecord) -> None:
+
+        if record._account_id:
+            self._by_account.setdefault(record._account_id, []).append(record)
+            self._index_amount(record)
+
+################################################################################
+    def _index_amount(self, record: SheetRecord) -> None:
+        """Pushes the record onto the heap for its (account ID, cents) key.
+
+        Entries are never removed eagerly; deleted records and records whose
+        amount has since changed are discarded when they surface in
+        pop_matching_record.
+        """
+
+        if not record._account_id or not record._amount or record._amount <= 0:
+            return
+
+        key = (record._account_id, U.to_cents(record._amount))
+        heapq.heappush(self._by_amount.setdefault(key, []), (record._row, record._id, record))
+
+################################################################################
+    def pop_matching_record(self, account_id: int, amount: float) -> Optional[SheetRecord]:
+        """Returns the lowest-row live record for the account with exactly this
+        positive amount, removing it from the amount index."""
+
+        key = (account_id, U.to_cents(amount))
+        heap = self._by_amount.get(key)
+        while heap:
+            _, _, record = heapq.heappop(heap)
+            if record._deleted or U.to_cents(record._amount or 0) != key[1]:
+                continue
+            return record
+
+        self._by_amount.pop(key, None)
+        return None
+
+################################################################################
+    def _unindex_record(self, record: SheetRecord) -> None:
+
+        bucket = self._by_account.get(record._account_id)
+        if not bucket:
+            return
+
+        for i, r in enumerate(bucket):
+            if r == record:
+                bucket.pop(i)
+                break
+
+        if not bucket:
+            del self._by_account[record._account_id]
+
+################################################################################
+    def _on_record_deleted(self, record: SheetRecord) -> None:
+
+        self._dead_count += 1
+        self._max_row -= 1
+        self._unindex_record(record)
 
 ################################################################################
     def get_account_id_and_names_from_text(
@@ -214,20 +510,17 @@ class _WorksheetBase(ABC):
             return
 
         # Extract name and ID from cell data
-        split_result = U.split_name_and_account(raw_name)
-        if split_result is None:
+        parsed = U.parse_account_name(raw_name)
+        if parsed is None:
             self._errors.append(NameParseError(self.title, raw_name, row_index))
             return
 
-        account_id, name_without_id = split_result
-
-        U.split_multi_names(name_without_id)
         names = [
             MemberName(first=n[0], last=n[1], raw=n[2])
-            for n in U.split_multi_names(name_without_id)
+            for n in parsed.members
         ]
 
-        return account_id, names
+        return parsed.account_id, names
 
 ################################################################################
     def reconcile_record(self, qb: QBServiceRecord) -> bool:
@@ -239,9 +532,8 @@ class _WorksheetBase(ABC):
             return True
 
         # Negative records need to find a matching positive record to reconcile against.
-        acct_records = self.get_records_by_account_id(qb.account_id)
         # If there are no records for this account, log an error.
-        if not acct_records:
+        if not qb.account_id or qb.account_id not in self._by_account:
             monthly_worksheet = self._parent["Monthly"]
             assert monthly_worksheet is not None
             success = monthly_worksheet.reconcile_record(qb)
@@ -256,15 +548,12 @@ class _WorksheetBase(ABC):
                 )
             return success
 
-        # Search through records for a matching amount to reconcile.
-        for record in acct_records:
-            if not record._amount:
-                continue
-
-            if 0 < record._amount == abs(qb.amount):
-                print(f"    Reconciling QB record {qb} with sheet record {record} in sheet '{self.title}'")
-                record.delete()
-                return True
+        # Look up the oldest record for this account with a matching amount.
+        record = self.pop_matching_record(qb.account_id, abs(qb.amount))
+        if record is not None:
+            print(f"    Reconciling QB record {qb} with sheet record {record} in sheet '{self.title}'")
+            record.delete()
+            return True
 
         print(f"    No matching record found for account ID {qb.account_id} and amount ${abs(qb.amount)} in sheet '{self.title}'")
         # If we get here, no matching record was found. Log an error.
@@ -297,6 +586,9 @@ class _WorksheetBase(ABC):
             expiry_date=qb.date + timedelta(days=365)
         )
         self._records.append(record)
+        self._max_row += 1
+        self._assign_key(record)
+        self._index_record(record)
 
 ################################################################################
     def get_records_by_account_id(self, account_id: Optional[int]) -> List[SheetRecord]:
@@ -304,27 +596,24 @@ class _WorksheetBase(ABC):
         if not account_id:
             return []
 
-        temp = [r for r in self._records if r._account_id == account_id]
+        # Account buckets are kept in sync by add_row/delete, so a lookup only
+        # touches the records that actually belong to this account.
         return sorted(
-            temp,
+            self._by_account.get(account_id, []),
             key=lambda r: r._row
         )
 
 ################################################################################
-    @staticmethod
     def value_with_highlight(
+        self,
         value: str,
-        color: Optional[Dict[str, float]],
+        color: Optional[Color],
         number_fmt: Optional[str] = None
     ) -> Dict[str, Any]:
 
         user_entered_format: Dict[str, Any] = {
             "backgroundColorStyle": {
-                "rgbColor": color or {
-                    "red": 1.0,
-                    "green": 1.0,
-                    "blue": 1.0,
-                }
+                "rgbColor": self._parent.palette.to_api(color)
             }
         }
 
@@ -359,14 +648,15 @@ class _WorksheetBase(ABC):
         Turns per-column pixel sizes into minimal updateDimensionProperties requests
         by grouping contiguous columns of the same size.
         """
-        if not self.column_sizes():
+        sizes = self.column_sizes()
+        if not sizes:
             return []
 
-        cols = sorted(self.column_sizes().keys())
+        cols = sorted(sizes.keys())
         requests: List[Dict[str, Any]] = []
 
         run_start = cols[0]
-        run_size = self.column_sizes()[run_start]
+        run_size = sizes[run_start]
         prev = run_start
 
         def flush(end_exclusive) -> None:
@@ -384,7 +674,7 @@ class _WorksheetBase(ABC):
             })
 
         for c in cols[1:]:
-            size = self.column_sizes()[c]
+            size = sizes[c]
             if c == prev + 1 and size == run_size:
                 prev = c
                 continue
@@ -520,6 +810,99 @@ class _WorksheetBase(ABC):
 
         return ret
 
+################################################################################
+    @property
+    def can_patch(self) -> bool:
+        """
+        Whether this tab was written by a previous run, so a server-side copy
+        of it can be patched instead of rewriting every row. Undated source
+        tabs are maintained by hand and are always rewritten in full. Needs
+        the spreadsheet to have been loaded with ``track_changes``.
+        """
+        return bool(self._snapshot) and self.base_title() != self.title
+
+################################################################################
+    def patch_requests(self, new_sheet_id: int) -> List[Dict[str, Any]]:
+        """
+        Requests that turn a duplicate of this tab into the rows that
+        append_cells_payload would write to a fresh one, sending only the
+        RecordDiff of the sheet. Deleted and moved records' old rows go, as do
+        old rows that held no record, moved and new records are inserted, and
+        every changed row is rewritten. Rows left alone keep any formatting
+        the app doesn't read, such as bold text.
+        """
+
+        self.compact()
+        records = self._records
+        width = U.column_to_index(self.relevant_col_end)
+        diff = RecordDiff.of_sheet(self)
+
+        removed = {change.key for change in diff if change.kind is ChangeKind.Delete}
+        # 0-based grid rows (row 0 is the title)
+        kept_rows = {snap.row - 1 for key, snap in self._snapshot.items() if key not in removed}
+        inserted = [change.row - 1 for change in diff if change.kind is ChangeKind.Insert]
+        dirty = sorted({change.row - 1 for change in diff if change.kind is not ChangeKind.Delete})
+
+        requests: List[Dict[str, Any]] = []
+
+        # Bottom-up so earlier deletions don't shift the later ranges
+        old_row_count = self.grid_properties.get("rowCount", self.max_row + 1)
+        deleted = self._runs(i for i in range(1, old_row_count) if i not in kept_rows)
+        for start, end in reversed(deleted):
+            requests.append(self._dimension_request("deleteDimension", new_sheet_id, start, end))
+
+        # Top-down so each insertion lands at its final index
+        for start, end in self._runs(inserted):
+            insert = self._dimension_request("insertDimension", new_sheet_id, start, end)
+            insert["insertDimension"]["inheritFromBefore"] = False
+            requests.append(insert)
+
+        for start, end in self._runs(dirty):
+            requests.append({
+                "updateCells": {
+                    # With a range, cells the rows don't cover are cleared
+                    "range": {
+                        "sheetId": new_sheet_id,
+                        "startRowIndex": start,
+                        "endRowIndex": end,
+                        "startColumnIndex": 0,
+                        "endColumnIndex": width,
+                    },
+                    "rows": [r.to_row_data() for r in records[start - 1:end - 1]],
+                    "fields": "*",
+                }
+            })
+
+        return requests
+
+################################################################################
+    @staticmethod
+    def _dimension_request(kind: str, sheet_id: int, start: int, end: int) -> Dict[str, Any]:
+
+        return {
+            kind: {
+                "range": {
+                    "sheetId": sheet_id,
+                    "dimension": "ROWS",
+                    "startIndex": start,
+                    "endIndex": end,
+                }
+            }
+        }
+
+################################################################################
+    @staticmethod
+    def _runs(indices: Iterable[int]) -> List[Tuple[int, int]]:
+        """Collapses ascending indices into (start, end exclusive) runs."""
+
+        runs: List[Tuple[int, int]] = []
+        for i in indices:
+            if runs and runs[-1][1] == i:
+                runs[-1] = (runs[-1][0], i + 1)
+            else:
+                runs.append((i, i + 1))
+        return runs
+
 ################################################################################
     @staticmethod
     def _pad_row(row: List[Mapping[str, Any]], pad_to: int) -> List[Mapping[str, Any]]:
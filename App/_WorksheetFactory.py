@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Type
 
 from App.Worksheets import (
     AnnualWorksheet,
@@ -22,23 +22,29 @@ __all__ = ("_WorksheetFactory", )
 class _WorksheetFactory:
 
     @staticmethod
-    def create(client: GSheetsClient, parent: Spreadsheet, payload: Dict[str, Any]) -> _WorksheetBase:
-
-        title = payload["properties"]["title"]
-        assert title is not None
-        cls = None
+    def class_for(title: str) -> Optional[Type[_WorksheetBase]]:
 
         if title.startswith("Annual"):
-            cls = AnnualWorksheet
+            return AnnualWorksheet
         elif title.startswith("Monthly"):
-            cls = MonthlyWorksheet
+            return MonthlyWorksheet
         elif title.startswith("Plumbing"):
-            cls = PlumbingWorksheet
+            return PlumbingWorksheet
         elif title.startswith("Generator"):
-            cls = GeneratorWorksheet
+            return GeneratorWorksheet
         elif title.startswith("Duct Cleaning"):
-            cls = DuctCleaningWorksheet
+            return DuctCleaningWorksheet
+
+        return None
+
+################################################################################
+    @staticmethod
+    def create(client: GSheetsClient, parent: Spreadsheet, payload: Dict[str, Any]) -> _WorksheetBase:
+
+        title = payload["properties"]["title"]
+        assert title is not None
 
+        cls = _WorksheetFactory.class_for(title)
         if cls is None:
             raise ValueError(f"Unknown worksheet type: {title}")
 
@@ -4,7 +4,7 @@ import re
 from datetime import date
 from typing import Type, Optional
 
-from sqlalchemy import Integer, String, UniqueConstraint, CheckConstraint, MetaData
+from sqlalchemy import Integer, String, Text, UniqueConstraint, CheckConstraint, MetaData
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, declared_attr
 
 from App.Classes import *
@@ -15,6 +15,8 @@ __all__ = (
     "BaseModel",
     "SheetRoutingRuleModel",
     "ApplicationStateModel",
+    "NameParseCacheEntryModel",
+    "SheetLayoutModel",
 )
 
 ################################################################################
@@ -87,3 +89,26 @@ class ApplicationStateModel(BaseModel[ApplicationState], IDMixin):
     last_run_date: Mapped[Optional[date]] = mapped_column()
 
 ################################################################################
+class NameParseCacheEntryModel(BaseModel[NameParseCacheEntry]):
+
+    _DC_TYPE = NameParseCacheEntry
+
+    raw: Mapped[str] = mapped_column(String(255), primary_key=True)
+    account_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    members: Mapped[str] = mapped_column(Text, nullable=False)
+
+################################################################################
+class SheetLayoutModel(BaseModel[SheetLayout], IDMixin):
+
+    _DC_TYPE = SheetLayout
+
+    spreadsheet_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    title: Mapped[str] = mapped_column(String(100), nullable=False)
+    sheet_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("spreadsheet_id", "title", name="uq_spreadsheet_title"),
+    )
+
+################################################################################
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date
 from typing import TYPE_CHECKING, List, Type, Any, Dict, Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 
 from App.Classes import *
@@ -13,7 +13,7 @@ if TYPE_CHECKING:
     pass
 ################################################################################
 
-__all__ = ("MatchingRuleRepo", "ApplicationStateRepo")
+__all__ = ("MatchingRuleRepo", "ApplicationStateRepo", "NameParseCacheRepo", "SheetLayoutRepo")
 
 ################################################################################
 class _RepoBase:
@@ -122,3 +122,47 @@ class ApplicationStateRepo(_RepoBase):
         return state.to_dataclass() if state is not None else None
 
 ################################################################################
+class NameParseCacheRepo(_RepoBase):
+
+    def list_all(self) -> List[NameParseCacheEntry]:
+
+        entries: List[NameParseCacheEntryModel] = self.s.scalars(  # type: ignore
+            select(NameParseCacheEntryModel)
+        ).all()
+        return [entry.to_dataclass() for entry in entries]
+
+################################################################################
+    def replace_all(self, entries: List[NameParseCacheEntry]) -> None:
+
+        self.s.execute(delete(NameParseCacheEntryModel))
+        if entries:
+            self.s.execute(
+                insert(NameParseCacheEntryModel),
+                [entry.__dict__ for entry in entries]
+            )
+        self.s.flush()
+
+################################################################################
+class SheetLayoutRepo(_RepoBase):
+
+    def list_for(self, spreadsheet_id: str) -> List[SheetLayout]:
+
+        layouts: List[SheetLayoutModel] = self.s.scalars(  # type: ignore
+            select(SheetLayoutModel)
+            .where(SheetLayoutModel.spreadsheet_id == spreadsheet_id)
+        ).all()
+        return [layout.to_dataclass() for layout in layouts]
+
+################################################################################
+    def replace_for(self, spreadsheet_id: str, layouts: List[SheetLayout]) -> None:
+
+        self.s.execute(
+            delete(SheetLayoutModel)
+            .where(SheetLayoutModel.spreadsheet_id == spreadsheet_id)
+        )
+        for layout in layouts:
+            data = {k: v for k, v in layout.__dict__.items() if k != "id"}
+            self.s.add(SheetLayoutModel(**data))
+        self.s.flush()
+
+################################################################################
@@ -21,6 +21,8 @@ class UnitOfWork:
 
         self._rules: MatchingRuleRepo = None  # type: ignore
         self.app_state: ApplicationStateRepo = None  # type: ignore
+        self.name_cache: NameParseCacheRepo = None  # type: ignore
+        self.sheet_layouts: SheetLayoutRepo = None  # type: ignore
 
 ################################################################################
     def __enter__(self) -> UnitOfWork:
@@ -29,6 +31,8 @@ class UnitOfWork:
 
         self._rules = MatchingRuleRepo(self._session)
         self.app_state = ApplicationStateRepo(self._session)
+        self.name_cache = NameParseCacheRepo(self._session)
+        self.sheet_layouts = SheetLayoutRepo(self._session)
 
         return self
 
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from .BatchPlanner import MAX_BATCH_BYTES
+from .Client import GSheetsClient
+
+if TYPE_CHECKING:
+    from .Client import ParamsType
+################################################################################
+
+__all__ = ("AsyncGSheetsClient", "GSheetsFacade")
+
+T = TypeVar("T")
+
+# Concurrent requests in flight. The per-minute quota is still enforced by the
+# underlying client's token bucket.
+MAX_CONCURRENCY = 8
+
+################################################################################
+class AsyncGSheetsClient:
+    """
+    Awaitable counterpart to GSheetsClient. Requests go through one shared
+    GSheetsClient - and so one connection pool, token, rate limiter and retry
+    policy - on a small worker pool, so independent calls made from the same
+    event loop overlap instead of running back to back.
+    """
+
+    __slots__ = (
+        "_client",
+        "_executor",
+    )
+
+################################################################################
+    def __init__(
+        self,
+        client: Optional[GSheetsClient] = None,
+        *,
+        max_concurrency: int = MAX_CONCURRENCY
+    ) -> None:
+
+        self._client: GSheetsClient = client or GSheetsClient()
+        self._client.set_pool_size(max_concurrency)
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="gsheets"
+        )
+
+################################################################################
+    @property
+    def sync_client(self) -> GSheetsClient:
+        return self._client
+
+################################################################################
+    async def _call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+################################################################################
+    async def spreadsheet_get(
+        self,
+        spreadsheet_id: str,
+        ranges: List[str] = None,
+        include_grid_data: bool = False,
+        fields: Optional[str] = None,
+        *,
+        use_cache: bool = False
+    ) -> Dict[str, Any]:
+
+        return await self._call(
+            self._client.spreadsheet_get,
+            spreadsheet_id,
+            ranges=ranges,
+            include_grid_data=include_grid_data,
+            fields=fields,
+            use_cache=use_cache
+        )
+
+################################################################################
+    async def batch_update_spreadsheet(
+        self,
+        spreadsheet_id: str,
+        body: Dict[str, Any]
+    ) -> Dict[str, Any]:
+
+        return await self._call(self._client.batch_update_spreadsheet, spreadsheet_id, body)
+
+################################################################################
+    async def batch_update_chunked(
+        self,
+        spreadsheet_id: str,
+        requests: Iterable[Dict[str, Any]],
+        *,
+        max_bytes: int = MAX_BATCH_BYTES
+    ) -> Dict[str, Any]:
+
+        return await self._call(
+            self._client.batch_update_chunked,
+            spreadsheet_id,
+            requests,
+            max_bytes=max_bytes
+        )
+
+################################################################################
+    async def values_batch_get(
+        self,
+        spreadsheet_id: str,
+        params: Optional[ParamsType] = None
+    ) -> Any:
+
+        return await self._call(self._client.values_batch_get, spreadsheet_id, params=params)
+
+################################################################################
+    async def values_append(
+        self,
+        spreadsheet_id: str,
+        cell_range: str,
+        body: Dict[str, Any],
+        params: Optional[ParamsType] = None
+    ) -> Any:
+
+        return await self._call(
+            self._client.values_append,
+            spreadsheet_id,
+            cell_range,
+            body,
+            params=params
+        )
+
+################################################################################
+    def close(self) -> None:
+
+        self._executor.shutdown(wait=True)
+
+################################################################################
+class GSheetsFacade:
+    """
+    Blocking front end for AsyncGSheetsClient, usable anywhere a GSheetsClient
+    is. Coroutines run on a private event loop thread, so callers that aren't
+    async themselves (eg. the Qt worker) can still fire off several requests
+    at once with ``gather``.
+    """
+
+    __slots__ = (
+        "_async",
+        "_loop",
+        "_thread",
+    )
+
+################################################################################
+    def __init__(self, async_client: Optional[AsyncGSheetsClient] = None) -> None:
+
+        self._async: AsyncGSheetsClient = async_client or AsyncGSheetsClient()
+        self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="gsheets-loop",
+            daemon=True
+        )
+        self._thread.start()
+
+################################################################################
+    @property
+    def async_client(self) -> AsyncGSheetsClient:
+        return self._async
+
+################################################################################
+    def run(self, coro: Awaitable[T]) -> T:
+        """Runs a coroutine on the facade's loop and blocks until it's done."""
+
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+################################################################################
+    def gather(self, *coros: Awaitable[Any]) -> List[Any]:
+        """Runs the coroutines concurrently, returning results in order."""
+
+        async def _gather() -> List[Any]:
+            return list(await asyncio.gather(*coros))
+
+        return self.run(_gather())
+
+################################################################################
+    def spreadsheet_get(
+        self,
+        spreadsheet_id: str,
+        ranges: List[str] = None,
+        include_grid_data: bool = False,
+        fields: Optional[str] = None,
+        *,
+        use_cache: bool = False
+    ) -> Dict[str, Any]:
+
+        return self.run(
+            self._async.spreadsheet_get(spreadsheet_id, ranges, include_grid_data, fields, use_cache=use_cache)
+        )
+
+################################################################################
+    def batch_update_spreadsheet(
+        self,
+        spreadsheet_id: str,
+        body: Dict[str, Any]
+    ) -> Dict[str, Any]:
+
+        return self.run(self._async.batch_update_spreadsheet(spreadsheet_id, body))
+
+################################################################################
+    def batch_update_chunked(
+        self,
+        spreadsheet_id: str,
+        requests: Iterable[Dict[str, Any]],
+        *,
+        max_bytes: int = MAX_BATCH_BYTES
+    ) -> Dict[str, Any]:
+
+        return self.run(self._async.batch_update_chunked(spreadsheet_id, requests, max_bytes=max_bytes))
+
+################################################################################
+    def values_batch_get(
+        self,
+        spreadsheet_id: str,
+        params: Optional[ParamsType] = None
+    ) -> Any:
+
+        return self.run(self._async.values_batch_get(spreadsheet_id, params))
+
+################################################################################
+    def values_append(
+        self,
+        spreadsheet_id: str,
+        cell_range: str,
+        body: Dict[str, Any],
+        params: Optional[ParamsType] = None
+    ) -> Any:
+
+        return self.run(self._async.values_append(spreadsheet_id, cell_range, body, params))
+
+################################################################################
+    def close(self) -> None:
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._async.close()
+
+################################################################################
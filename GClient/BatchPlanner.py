@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple
+################################################################################
+
+__all__ = ("BatchPlanner", "BatchMetrics", "MAX_BATCH_BYTES")
+
+# Google recommends keeping request payloads under 2 MB; much larger bodies are
+# rejected or time out.
+MAX_BATCH_BYTES = 2_000_000
+
+_BODY_PREFIX = b'{"requests":['
+_BODY_SUFFIX = b'],"includeSpreadsheetInResponse":false}'
+
+################################################################################
+class BatchMetrics(NamedTuple):
+
+    index: int
+    request_count: int
+    size_bytes: int
+    seconds: float
+
+################################################################################
+class BatchPlanner:
+    """
+    Splits a list of batchUpdate requests into consecutive, size-bounded
+    request bodies. Each request is serialized exactly once and batches are
+    sent in order, so requests that depend on earlier ones (eg. several
+    appendCells to the same sheet) still apply in sequence.
+    """
+
+    __slots__ = (
+        "_max_bytes",
+    )
+
+################################################################################
+    def __init__(self, max_bytes: int = MAX_BATCH_BYTES) -> None:
+
+        self._max_bytes: int = max_bytes
+
+################################################################################
+    @staticmethod
+    def encode(request: Dict[str, Any]) -> bytes:
+
+        return json.dumps(request, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+################################################################################
+    @staticmethod
+    def body(pieces: List[bytes]) -> bytes:
+
+        return _BODY_PREFIX + b",".join(pieces) + _BODY_SUFFIX
+
+################################################################################
+    def plan(self, requests: Iterable[Dict[str, Any]]) -> Iterator[List[bytes]]:
+        """Yields each batch as a list of encoded requests, in order."""
+
+        budget = self._max_bytes - len(_BODY_PREFIX) - len(_BODY_SUFFIX)
+        batch: List[bytes] = []
+        size = 0
+
+        for request in requests:
+            for piece in self._split(request, self.encode(request), budget):
+                # +1 for the separating comma
+                if batch and size + 1 + len(piece) > budget:
+                    yield batch
+                    batch, size = [], 0
+                size += len(piece) + (1 if batch else 0)
+                batch.append(piece)
+
+        if batch:
+            yield batch
+
+################################################################################
+    def _split(self, request: Dict[str, Any], encoded: bytes, budget: int) -> Iterator[bytes]:
+        """
+        Breaks a single oversized appendCells or updateCells into several
+        smaller ones for the same sheet. Appends follow one another; updates
+        are split by row range, so each part writes the same cells it would
+        have as a whole. Anything else that doesn't fit is passed through and
+        left for the API to reject.
+        """
+
+        # A request has a single key naming its kind
+        kind, body = next(iter(request.items()))
+        rows = body.get("rows", []) if kind in ("appendCells", "updateCells") else []
+
+        if len(encoded) <= budget or len(rows) < 2:
+            yield encoded
+            return
+
+        half = len(rows) // 2
+        for sub in self._halves(kind, body, half):
+            yield from self._split(sub, self.encode(sub), budget)
+
+################################################################################
+    @staticmethod
+    def _halves(kind: str, body: Dict[str, Any], half: int) -> Iterator[Dict[str, Any]]:
+
+        rows = body["rows"]
+        if kind == "appendCells":
+            yield {kind: {**body, "rows": rows[:half]}}
+            yield {kind: {**body, "rows": rows[half:]}}
+            return
+
+        if "start" in body:
+            start = body["start"]
+            row = start.get("rowIndex", 0)
+            yield {kind: {**body, "rows": rows[:half]}}
+            yield {kind: {**body, "start": {**start, "rowIndex": row + half}, "rows": rows[half:]}}
+            return
+
+        # The second half keeps the original end, so any rows the range
+        # covers beyond the given ones are still cleared
+        grid = body["range"]
+        mid = grid.get("startRowIndex", 0) + half
+        yield {kind: {**body, "range": {**grid, "endRowIndex": mid}, "rows": rows[:half]}}
+        yield {kind: {**body, "range": {**grid, "startRowIndex": mid}, "rows": rows[half:]}}
+
+################################################################################
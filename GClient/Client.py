@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import (
     TYPE_CHECKING, MutableMapping, Any, Optional, Union, List, Mapping,
-    IO, Tuple, Dict
+    IO, Tuple, Dict, Iterable
 )
 
 import requests
-from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from google.auth.transport.requests import AuthorizedSession, Request
 from google.oauth2.service_account import Credentials as SACredentials
 from Utilities import Utilities as U
+from .BatchPlanner import BatchMetrics, BatchPlanner, MAX_BATCH_BYTES
+from .Exceptions import *
+from .PayloadCache import PayloadCache
+from .RateLimiter import TokenBucket
 
 if TYPE_CHECKING:
     from google.auth.credentials import Credentials
@@ -23,6 +35,16 @@ SPREADSHEET_BATCH_UPDATE_URL = f"{SPREADSHEET_URL}:batchUpdate"
 SPREADSHEET_COPY_TO_URL = f"{SPREADSHEET_URL}/sheets/{{sheetId}}:copyTo"
 SPREADSHEET_VALUES_BATCH_URL = f"{SPREADSHEET_URL}/values:batchGet"
 SPREADSHEET_VALUES_APPEND_URL = f"{SPREADSHEET_VALUES_URL}:append"
+DRIVE_FILE_URL = "https://www.googleapis.com/drive/v3/files/{fileId}"
+
+# Methods that are safe to resend after the server may already have acted on them
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+# Default per-user Sheets API quota (read and write requests each get 60/min).
+REQUESTS_PER_MINUTE = 60
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 64.0
 
 ParamsType = MutableMapping[str, Optional[Union[str, int, bool, float, List[str]]]]
 FileType = Optional[
@@ -42,14 +64,29 @@ class GSheetsClient:
         "_session",
         "_timeout",
         "_service",
+        "_bucket",
+        "_max_retries",
+        "_refresh_lock",
+        "_payload_cache",
     )
 
 ################################################################################
-    def __init__(self, svc_account_file: str = "service_account.json") -> None:
+    def __init__(
+        self,
+        svc_account_file: str = "service_account.json",
+        *,
+        requests_per_minute: int = REQUESTS_PER_MINUTE,
+        max_retries: int = MAX_RETRIES,
+        payload_cache: Optional[PayloadCache] = None
+    ) -> None:
 
         self._auth: Credentials = self._build_credentials(svc_account_file)
         self._session: AuthorizedSession = AuthorizedSession(self._auth)
         self._timeout: float = 30.0
+        self._bucket: TokenBucket = TokenBucket(requests_per_minute)
+        self._max_retries: int = max_retries
+        self._refresh_lock: threading.Lock = threading.Lock()
+        self._payload_cache: Optional[PayloadCache] = payload_cache
 
 ################################################################################
     @staticmethod
@@ -64,11 +101,43 @@ class GSheetsClient:
 
 ################################################################################
     def login(self) -> None:
-        from google.auth.transport.requests import Request
 
         self._auth.refresh(Request(self._session))
         self._session.headers.update({"Authorization": "Bearer %s" % self._auth.token})
 
+################################################################################
+    def ensure_token(self) -> None:
+        """
+        Refreshes the access token if it's missing or about to expire. Only
+        one thread refreshes; the others wait for it and reuse the new token.
+        """
+
+        if self._auth.valid:
+            return
+
+        with self._refresh_lock:
+            if not self._auth.valid:
+                self._auth.refresh(Request(self._session))
+
+################################################################################
+    def refresh_token(self) -> None:
+        """Fetches a new access token even if the current one is still valid."""
+
+        with self._refresh_lock:
+            self._auth.refresh(Request(self._session))
+
+################################################################################
+    @property
+    def credentials(self) -> Credentials:
+        return self._auth
+
+################################################################################
+    def set_pool_size(self, size: int) -> None:
+        """Keeps up to ``size`` connections open so concurrent requests don't queue."""
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        self._session.mount("https://", adapter)
+
 ################################################################################
     def request(
         self,
@@ -81,43 +150,167 @@ class GSheetsClient:
         headers: Optional[MutableMapping[str, str]] = None,
     ) -> requests.Response:
 
-        response = self._session.request(
-            method=method,
-            url=url,
-            params=params,
-            data=data,
-            json=json,
-            files=files,
-            headers=headers,
-            timeout=self._timeout,
-        )
+        """
+        Sends a request through the rate limiter. 429 responses and failures
+        to connect are retried with exponential backoff (or after the server's
+        Retry-After) up to ``max_retries`` times, as is any 5xx or timeout on
+        a GET. Writes such as batchUpdate are not resent once they may have
+        reached the server, since applying one twice duplicates rows or fails
+        on tabs that already exist. Other failures raise the matching
+        ``GSheetsError`` subclass.
+        """
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.ensure_token()
+            self._bucket.acquire()
+
+            try:
+                response = self._session.request(
+                    method=method,
+                    url=url,
+                    params=params,
+                    data=data,
+                    json=json,
+                    files=files,
+                    headers=headers,
+                    timeout=self._timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                if attempt >= self._max_retries or not (idempotent or self._never_sent(ex)):
+                    raise
+                delay = self._backoff_delay(attempt)
+                print(f"{method} {url} failed ({ex}). Retrying in {delay:.1f}s...")
+            else:
+                if response.ok:
+                    return response
+
+                error = error_for_response(response)
+                # A 429 means the request was refused outright
+                resendable = idempotent or isinstance(error, GSheetsRateLimitError)
+                if not error.retryable or not resendable or attempt >= self._max_retries:
+                    raise error
+
+                if isinstance(error, GSheetsRateLimitError):
+                    # Stop the other threads from spending the quota we just ran out of
+                    self._bucket.drain()
+
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                print(f"{method} {url} returned {error.status}. Retrying in {delay:.1f}s...")
+
+            time.sleep(delay)
+            attempt += 1
 
-        if response.ok:
-            return response
-        # TODO: Handle this more gracefully
-        print(response.json())
-        raise Exception(response.text)
+################################################################################
+    @staticmethod
+    def _never_sent(ex: requests.RequestException) -> bool:
+        """Whether the request failed before a connection was made, so the server never saw it."""
+
+        if isinstance(ex, requests.ConnectTimeout):
+            return True
+        reason = getattr(ex.args[0], "reason", None) if ex.args else None
+        return isinstance(reason, NewConnectionError)
+
+################################################################################
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        # "Full jitter": a random delay up to the capped exponential backoff
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+################################################################################
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Seconds to wait according to the Retry-After header, if present."""
+
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
 
 ################################################################################
     def spreadsheet_get(
         self,
         spreadsheet_id: str,
         ranges: List[str] = None,
-        include_grid_data: bool = False
+        include_grid_data: bool = False,
+        fields: Optional[str] = None,
+        *,
+        use_cache: bool = False
     ) -> Dict[str, Any]:
+        """
+        ``fields`` is a Sheets API field mask (eg. "sheets.properties.title");
+        only the listed parts of the Spreadsheet resource are returned.
+
+        With ``use_cache`` (and a payload cache configured), the response is
+        served from disk if the spreadsheet's Drive revision hasn't changed
+        since it was stored, at the cost of one small Drive metadata call.
+        """
+
+        key: Optional[str] = None
+        revision: Optional[str] = None
+        if use_cache and self._payload_cache is not None:
+            # The cache is only ever a shortcut; if Drive or the disk fails,
+            # fetch from Sheets as if it weren't there.
+            try:
+                revision = self.drive_file_revision(spreadsheet_id)
+                key = PayloadCache.key_for(spreadsheet_id, ranges, include_grid_data, fields)
+                cached = self._payload_cache.get(key, revision)
+            except Exception as ex:
+                print(f"Spreadsheet cache unavailable ({ex}). Fetching without it.")
+                key = None
+                cached = None
+            if cached is not None:
+                return cached
 
         params: ParamsType = {
             "includeGridData": include_grid_data
         }
         if ranges:
             params["ranges"] = ranges
+        if fields:
+            params["fields"] = fields
 
         resp = self.request(
             "GET",
             SPREADSHEET_URL.format(spreadsheetId=spreadsheet_id),
             params=params
         )
-        return resp.json()
+        payload = resp.json()
+
+        if key is not None:
+            # The revision was read before the fetch, so if the sheet changed in
+            # between, the next run sees a newer revision and refetches.
+            try:
+                self._payload_cache.put(key, revision, payload)
+            except Exception as ex:
+                print(f"Unable to cache spreadsheet payload: {ex}")
+
+        return payload
+
+################################################################################
+    def drive_file_revision(self, file_id: str) -> str:
+        """Identifies the file's current revision; changes on every edit."""
+
+        resp = self.request(
+            "GET",
+            DRIVE_FILE_URL.format(fileId=file_id),
+            params={"fields": "version,modifiedTime", "supportsAllDrives": True}
+        )
+        meta = resp.json()
+        return f"{meta.get('version', '')}:{meta.get('modifiedTime', '')}"
 
 ################################################################################
     def spreadsheet_create(self, payload: Dict[str, Any]) -> str:
@@ -144,6 +337,51 @@ class GSheetsClient:
         )
         return resp.json()
 
+################################################################################
+    def batch_update_chunked(
+        self,
+        spreadsheet_id: str,
+        requests: Iterable[Dict[str, Any]],
+        *,
+        max_bytes: int = MAX_BATCH_BYTES
+    ) -> Dict[str, Any]:
+        """
+        Sends ``requests`` as a series of batchUpdate calls no larger than
+        ``max_bytes`` each, in order. The next batch is serialized while the
+        previous one uploads. Replies from all batches are concatenated;
+        appendCells requests that had to be split produce one reply per part.
+        """
+
+        url = SPREADSHEET_BATCH_UPDATE_URL.format(spreadsheetId=spreadsheet_id)
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        replies: List[Dict[str, Any]] = []
+        metrics: List[BatchMetrics] = []
+
+        def _send(index: int, count: int, body: bytes) -> Dict[str, Any]:
+            start = time.perf_counter()
+            resp = self.request("POST", url, data=body, headers=dict(headers)).json()
+            metrics.append(BatchMetrics(index, count, len(body), time.perf_counter() - start))
+            return resp
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="gsheets-batch") as sender:
+            in_flight = None
+            for index, pieces in enumerate(BatchPlanner(max_bytes).plan(requests), 1):
+                body = BatchPlanner.body(pieces)
+                if in_flight is not None:
+                    replies.extend(in_flight.result().get("replies", []))
+                in_flight = sender.submit(_send, index, len(pieces), body)
+
+            if in_flight is not None:
+                replies.extend(in_flight.result().get("replies", []))
+
+        for m in metrics:
+            print(
+                f"batchUpdate {m.index}/{len(metrics)}: {m.request_count} requests, "
+                f"{m.size_bytes / 1024:.1f} KiB in {m.seconds:.2f}s"
+            )
+
+        return {"spreadsheetId": spreadsheet_id, "replies": replies}
+
 ################################################################################
     # TODO: Update return type once ValueBatchGetResponse is implemented
     def values_batch_get(
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+################################################################################
+
+__all__ = (
+    "GSheetsError",
+    "GSheetsBadRequestError",
+    "GSheetsPermissionError",
+    "GSheetsNotFoundError",
+    "GSheetsRateLimitError",
+    "GSheetsServerError",
+    "error_for_response",
+)
+
+################################################################################
+class GSheetsError(Exception):
+
+    def __init__(
+        self,
+        msg: str,
+        status: int,
+        reason: Optional[str] = None,
+        response: Optional[requests.Response] = None
+    ) -> None:
+
+        self.msg: str = msg
+        self.status: int = status
+        self.reason: Optional[str] = reason
+        self.response: Optional[requests.Response] = response
+        super().__init__(f"[{status}{f' {reason}' if reason else ''}] {msg}")
+
+    @property
+    def retryable(self) -> bool:
+        return False
+
+################################################################################
+class GSheetsBadRequestError(GSheetsError):
+    # 400 - malformed request, unknown range, invalid field mask...
+    pass
+
+################################################################################
+class GSheetsPermissionError(GSheetsError):
+    # 401 / 403 that isn't a quota error
+    pass
+
+################################################################################
+class GSheetsNotFoundError(GSheetsError):
+    pass
+
+################################################################################
+class GSheetsRateLimitError(GSheetsError):
+
+    @property
+    def retryable(self) -> bool:
+        return True
+
+################################################################################
+class GSheetsServerError(GSheetsError):
+
+    @property
+    def retryable(self) -> bool:
+        return True
+
+################################################################################
+def error_for_response(response: requests.Response) -> GSheetsError:
+    """Maps a failed Sheets API response onto the matching exception type."""
+
+    status = response.status_code
+    reason: Optional[str] = None
+    msg = response.text
+
+    try:
+        error = response.json().get("error", {})
+        msg = error.get("message", msg)
+        reason = error.get("status")
+    except ValueError:
+        pass
+
+    if status == 429 or reason == "RESOURCE_EXHAUSTED":
+        cls = GSheetsRateLimitError
+    elif status >= 500:
+        cls = GSheetsServerError
+    elif status == 404:
+        cls = GSheetsNotFoundError
+    elif status in (401, 403):
+        cls = GSheetsPermissionError
+    elif status == 400:
+        cls = GSheetsBadRequestError
+    else:
+        cls = GSheetsError
+
+    return cls(msg, status, reason, response)
+
+################################################################################
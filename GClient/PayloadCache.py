@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+################################################################################
+
+__all__ = ("PayloadCache", )
+
+################################################################################
+class PayloadCache:
+    """
+    spreadsheet_get responses on disk, gzip-compressed and then encrypted,
+    since grid payloads carry customer names, accounts and amounts. Each
+    entry remembers the Drive revision it was fetched at and is only served
+    while the spreadsheet is still at that revision.
+    """
+
+    __slots__ = (
+        "_dir",
+        "_fernet",
+    )
+
+################################################################################
+    def __init__(self, directory: Path, fernet: Fernet) -> None:
+
+        self._dir: Path = directory
+        self._fernet: Fernet = fernet
+
+################################################################################
+    @staticmethod
+    def key_for(
+        spreadsheet_id: str,
+        ranges: Optional[List[str]],
+        include_grid_data: bool,
+        fields: Optional[str]
+    ) -> str:
+
+        raw = json.dumps([spreadsheet_id, ranges or [], include_grid_data, fields or ""])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+################################################################################
+    def get(self, key: str, revision: str) -> Optional[Dict[str, Any]]:
+
+        try:
+            raw = self._fernet.decrypt(self._path(key).read_bytes())
+            entry = json.loads(gzip.decompress(raw))
+        except (OSError, InvalidToken, ValueError, EOFError):
+            return None
+
+        if entry.get("revision") != revision:
+            return None
+        return entry.get("payload")
+
+################################################################################
+    def put(self, key: str, revision: str, payload: Dict[str, Any]) -> None:
+
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        entry = json.dumps({"revision": revision, "payload": payload}, separators=(",", ":"))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(self._fernet.encrypt(gzip.compress(entry.encode("utf-8"), compresslevel=6)))
+            os.replace(tmp, path)
+        except OSError as ex:
+            print(f"Unable to write spreadsheet cache: {ex}")
+
+################################################################################
+    def _path(self, key: str) -> Path:
+
+        return self._dir / f"{key}.bin"
+
+################################################################################
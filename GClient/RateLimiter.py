@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+import time
+################################################################################
+
+__all__ = ("TokenBucket", )
+
+################################################################################
+class TokenBucket:
+    """
+    Thread-safe token bucket. Holds up to ``capacity`` tokens and refills at
+    ``rate_per_minute``; ``acquire`` blocks until a token is available.
+    """
+
+    __slots__ = (
+        "_capacity",
+        "_rate",
+        "_tokens",
+        "_updated",
+        "_lock",
+    )
+
+################################################################################
+    def __init__(self, rate_per_minute: float, capacity: int | None = None) -> None:
+
+        self._capacity: float = float(capacity if capacity is not None else rate_per_minute)
+        self._rate: float = rate_per_minute / 60.0
+        self._tokens: float = self._capacity
+        self._updated: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+
+################################################################################
+    def acquire(self) -> float:
+        """Takes one token, sleeping if needed. Returns the time spent waiting."""
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                wait = (1.0 - self._tokens) / self._rate
+
+            time.sleep(wait)
+            waited += wait
+
+################################################################################
+    def drain(self) -> None:
+        """Empties the bucket, eg. after the server reports the quota is exhausted."""
+
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+################################################################################
+    def _refill(self) -> None:
+
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+################################################################################
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import platformdirs
+from cryptography.fernet import Fernet, InvalidToken
+
+from .AsyncClient import AsyncGSheetsClient, GSheetsFacade
+from .Client import GSheetsClient
+from .PayloadCache import PayloadCache
+################################################################################
+
+__all__ = ("ClientRegistry", "TokenCache", "CLIENTS", "get_client", "account_cipher")
+
+# Refresh the access token this long before Google expires it, so requests
+# never stall on a refresh mid-run.
+REFRESH_MARGIN = timedelta(minutes=5)
+# How often the background refresher wakes to check the token's expiry.
+REFRESH_CHECK_INTERVAL = 60.0
+
+CACHE_DIR = Path(
+    os.getenv("GSHEETS_CACHE_DIR")
+    or platformdirs.user_cache_dir("Service Account Reconciler", "Frogge Tech Solutions")
+)
+
+################################################################################
+def _utcnow() -> datetime:
+    # google-auth keeps credential expiries as naive UTC datetimes
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+################################################################################
+def account_cipher(svc_account_file: str) -> Tuple[str, Fernet]:
+    """
+    A short, stable name for the service account and a Fernet keyed by its
+    private key, for encrypting whatever is cached on its behalf. Anyone who
+    can read the key file can reach the same data through the API anyway;
+    the cache files alone are useless without it.
+    """
+
+    with open(svc_account_file, "r", encoding="utf-8") as f:
+        info = json.load(f)
+
+    secret = f"{info['client_email']}\n{info['private_key']}".encode("utf-8")
+    key = base64.urlsafe_b64encode(hashlib.sha256(secret).digest())
+    name = hashlib.sha256(info["client_email"].encode()).hexdigest()[:16]
+
+    return name, Fernet(key)
+
+################################################################################
+class TokenCache:
+    """
+    Access token for one service account, stored on disk and encrypted with
+    account_cipher, so the cache file alone can't be replayed.
+    """
+
+    __slots__ = (
+        "_path",
+        "_fernet",
+    )
+
+################################################################################
+    def __init__(self, svc_account_file: str, cache_dir: Path = CACHE_DIR) -> None:
+
+        name, fernet = account_cipher(svc_account_file)
+
+        self._fernet: Fernet = fernet
+        self._path: Path = cache_dir / f"{name}.token"
+
+################################################################################
+    def load(self, client: GSheetsClient) -> bool:
+        """Installs the cached token on the client if it's still usable."""
+
+        try:
+            raw = self._fernet.decrypt(self._path.read_bytes())
+            data = json.loads(raw)
+            expiry = datetime.fromisoformat(data["expiry"])
+        except (OSError, InvalidToken, ValueError, KeyError):
+            return False
+
+        if expiry - REFRESH_MARGIN <= _utcnow():
+            return False
+
+        creds = client.credentials
+        creds.token = data["token"]
+        creds.expiry = expiry
+        return True
+
+################################################################################
+    def save(self, client: GSheetsClient) -> None:
+
+        creds = client.credentials
+        if not creds.token or creds.expiry is None:
+            return
+
+        payload = json.dumps({"token": creds.token, "expiry": creds.expiry.isoformat()})
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(".tmp")
+            tmp.write_bytes(self._fernet.encrypt(payload.encode("utf-8")))
+            os.replace(tmp, self._path)
+        except OSError as ex:
+            print(f"Unable to write token cache: {ex}")
+
+################################################################################
+class _TokenRefresher:
+    """Background thread that renews a client's token before it expires."""
+
+    __slots__ = (
+        "_client",
+        "_cache",
+        "_stop",
+        "_thread",
+        "_saved_token",
+    )
+
+################################################################################
+    def __init__(self, client: GSheetsClient, cache: TokenCache) -> None:
+
+        self._client: GSheetsClient = client
+        self._cache: TokenCache = cache
+        self._stop: threading.Event = threading.Event()
+        self._saved_token: Optional[str] = client.credentials.token
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run,
+            name="gsheets-token-refresh",
+            daemon=True
+        )
+        self._thread.start()
+
+################################################################################
+    def _run(self) -> None:
+
+        while True:
+            self.tick()
+            if self._stop.wait(REFRESH_CHECK_INTERVAL):
+                return
+
+################################################################################
+    def tick(self) -> None:
+
+        creds = self._client.credentials
+        try:
+            if creds.expiry is None or creds.expiry - REFRESH_MARGIN <= _utcnow():
+                self._client.refresh_token()
+        except Exception as ex:
+            # Requests will refresh on demand; try again on the next tick.
+            print(f"Background token refresh failed: {ex}")
+            return
+
+        # Also picks up tokens refreshed on demand by GSheetsClient.ensure_token
+        if creds.token != self._saved_token:
+            self._cache.save(self._client)
+            self._saved_token = creds.token
+
+################################################################################
+    def stop(self) -> None:
+
+        self._stop.set()
+        self._thread.join()
+
+################################################################################
+class ClientRegistry:
+    """
+    Process-wide GSheetsFacade per service account file. Reusing one keeps its
+    session's connections (and TLS handshakes) and access token warm across
+    reconciler runs. Tokens are also cached on disk, so a new process skips
+    the OAuth exchange while the last token is still good, as are grid
+    payloads requested with ``use_cache``. Both are encrypted per account.
+    """
+
+    __slots__ = (
+        "_lock",
+        "_clients",
+        "_refreshers",
+    )
+
+################################################################################
+    def __init__(self) -> None:
+
+        self._lock: threading.Lock = threading.Lock()
+        self._clients: Dict[str, GSheetsFacade] = {}
+        self._refreshers: Dict[str, _TokenRefresher] = {}
+
+################################################################################
+    def get(self, svc_account_file: str = "service_account.json") -> GSheetsFacade:
+
+        key = str(Path(svc_account_file).resolve())
+
+        with self._lock:
+            facade = self._clients.get(key)
+            if facade is None:
+                # Payloads hold customer data, so they're encrypted like the token
+                name, fernet = account_cipher(svc_account_file)
+                client = GSheetsClient(
+                    svc_account_file,
+                    payload_cache=PayloadCache(CACHE_DIR / "payloads" / name, fernet)
+                )
+                cache = TokenCache(svc_account_file)
+                if cache.load(client):
+                    print("Reusing cached Google access token.")
+
+                facade = GSheetsFacade(AsyncGSheetsClient(client))
+                self._clients[key] = facade
+                self._refreshers[key] = _TokenRefresher(client, cache)
+
+        return facade
+
+################################################################################
+    def close_all(self) -> None:
+
+        with self._lock:
+            for refresher in self._refreshers.values():
+                refresher.stop()
+            for facade in self._clients.values():
+                facade.close()
+            self._refreshers.clear()
+            self._clients.clear()
+
+################################################################################
+
+CLIENTS = ClientRegistry()
+
+################################################################################
+def get_client(svc_account_file: str = "service_account.json") -> GSheetsFacade:
+
+    return CLIENTS.get(svc_account_file)
+
+################################################################################
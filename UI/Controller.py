@@ -8,6 +8,7 @@ from PySide6.QtCore import QObject, QThread, Slot
 from PySide6.QtWidgets import QMessageBox
 
 from App.AppStateManager import AppStateManager
+from App.Classes import RunOptions
 from App.RuleManager import RoutingRuleManager
 from .RulesDialog import RoutingRulesDialog
 from .Worker import ReconciliationWorker
@@ -96,6 +97,7 @@ class ReconciliationController(QObject):
             rule_mgr=self._rule_mgr,
             run_date=run_date,
             last_run_date=self._app_state.last_run_date,
+            options=RunOptions.from_env(),
         )
         self._worker.moveToThread(self._thread)
 
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING, Optional
 
 from PySide6.QtCore import Signal, QObject, Slot
 
+from App.Classes import RunOptions
 from App.Reconciler import ServiceReconciler
 
 if TYPE_CHECKING:
@@ -30,6 +31,7 @@ class ReconciliationWorker(QObject):
         rule_mgr: RoutingRuleManager,
         run_date: date,
         last_run_date: Optional[date],
+        options: Optional[RunOptions] = None,
     ) -> None:
         super().__init__()
 
@@ -39,6 +41,7 @@ class ReconciliationWorker(QObject):
         self._cancel_requested = False
         self._run_date: date = run_date
         self._last_run_date: Optional[date] = last_run_date
+        self._options: RunOptions = options or RunOptions()
 
         self._rule_mgr: RoutingRuleManager = rule_mgr
 
@@ -61,20 +64,26 @@ class ReconciliationWorker(QObject):
     @Slot()
     def run(self) -> None:
 
-        reconciler = ServiceReconciler(self._rule_mgr)
+        options = self._options
+        reconciler = ServiceReconciler(self._rule_mgr, persist_name_cache=options.persist_name_cache)
         try:
             # Phase 1: Load Data
             self.phase_changed.emit("Loading spreadsheet...", 5)
             self.progress_busy.emit(True)
             self.log_line.emit("[1/4] Loading and parsing spreadsheet payload...")
-            reconciler.load_data(self._spreadsheet_id, self._last_run_date)
+            reconciler.load_data(
+                self._spreadsheet_id,
+                self._last_run_date,
+                probe_rows=options.probe_rows,
+                track_changes=options.track_changes
+            )
             if self._check_cancel():
                 return
             # Phase 2: Load QB CSV
             self.progress_busy.emit(False)
             self.phase_changed.emit("Parsing QuickBooks CSV...", 15)
             self.log_line.emit("[2/4] Loading and parsing QuickBooks export CSV...")
-            reconciler.load_qb_export(Path(self._qb_csv_path))
+            reconciler.load_qb_export(Path(self._qb_csv_path), stream=options.stream)
             if self._check_cancel():
                 return
 
@@ -93,7 +102,11 @@ class ReconciliationWorker(QObject):
                 self.phase_changed.emit("Writing back. Please Wait...", 90)
                 self.progress_busy.emit(True)
                 self.log_line.emit("[4/4] Writing changes back to spreadsheet. This may take several moments...")
-                reconciler.write_to_destination(self._run_date.strftime("%m-%d-%Y"))
+                reconciler.write_to_destination(
+                    self._run_date.strftime("%m-%d-%Y"),
+                    mode=options.mode,
+                    formats=options.formats
+                )
                 self.progress_busy.emit(False)
                 self.phase_changed.emit("Done!", 100)
                 self.log_line.emit("[4/4] Changes written to spreadsheet.")
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Dict, Mapping, Optional, Tuple
+################################################################################
+
+__all__ = ("Color", "ColorPalette", "WHITE")
+
+################################################################################
+class Color(int):
+    """
+    An RGB color packed as 0xRRGGBB. Sheets renders colors at 8 bits per
+    channel, so nothing visible is lost by packing the API's floats.
+    """
+
+    __slots__ = ()
+
+################################################################################
+    @classmethod
+    def from_api(cls, rgb: Mapping[str, float]) -> Color:
+        # The API leaves out channels that are 0
+        return cls(
+            round(rgb.get("red", 0.0) * 255) << 16
+            | round(rgb.get("green", 0.0) * 255) << 8
+            | round(rgb.get("blue", 0.0) * 255)
+        )
+
+################################################################################
+    @classmethod
+    def from_hex(cls, value: str) -> Color:
+        """Accepts '#RRGGBB', eg. '#34A853'."""
+
+        return cls(int(value.lstrip("#"), 16))
+
+################################################################################
+    @property
+    def channels(self) -> Tuple[int, int, int]:
+
+        return self >> 16 & 0xFF, self >> 8 & 0xFF, self & 0xFF
+
+################################################################################
+    def to_api(self) -> Dict[str, float]:
+        # Leaves out 0 channels, as the API does
+        return {
+            name: value / 255
+            for name, value in zip(("red", "green", "blue"), self.channels)
+            if value
+        }
+
+################################################################################
+    def __repr__(self) -> str:
+
+        return f"Color(#{int(self):06X})"
+
+################################################################################
+
+WHITE = Color(0xFFFFFF)
+
+################################################################################
+class ColorPalette:
+    """
+    The distinct colors of one spreadsheet. Every cell of a color shares one
+    Color instance and one API dict, and theme colors are resolved once.
+    """
+
+    __slots__ = (
+        "_colors",
+        "_api",
+        "_by_rgb",
+        "_themes",
+    )
+
+################################################################################
+    def __init__(self, theme_colors: Mapping[str, Mapping[str, float]]) -> None:
+
+        self._colors: Dict[int, Color] = {}
+        self._api: Dict[int, Dict[str, float]] = {}
+        # Raw API channels -> color, to skip rounding colors already seen
+        self._by_rgb: Dict[Tuple[float, float, float], Color] = {}
+        self._themes: Dict[str, Color] = {}
+        self.load_themes(theme_colors)
+
+################################################################################
+    def load_themes(self, theme_colors: Mapping[str, Mapping[str, float]]) -> None:
+
+        self._themes = {
+            color_type: self.from_rgb(rgb)
+            for color_type, rgb in theme_colors.items()
+        }
+
+################################################################################
+    def intern(self, color: Color) -> Color:
+
+        return self._colors.setdefault(color, color)
+
+################################################################################
+    def from_rgb(self, rgb: Mapping[str, float]) -> Color:
+
+        key = (rgb.get("red", 0.0), rgb.get("green", 0.0), rgb.get("blue", 0.0))
+        color = self._by_rgb.get(key)
+        if color is None:
+            color = self._by_rgb.setdefault(key, self.intern(Color.from_api(rgb)))
+        return color
+
+################################################################################
+    def resolve(self, style: Mapping[str, Mapping[str, float] | str]) -> Color:
+        """The color of a backgroundColorStyle, which is either RGB or a theme color."""
+
+        rgb = style.get("rgbColor")
+        if rgb is not None:
+            return self.from_rgb(rgb)
+        return self._themes[style["themeColor"]]
+
+################################################################################
+    def to_api(self, color: Optional[Color]) -> Dict[str, float]:
+        """A shared rgbColor dict for the color, white if there is none."""
+
+        if color is None:
+            color = WHITE
+        api = self._api.get(color)
+        if api is None:
+            api = self._api.setdefault(color, color.to_api())
+        return api
+
+################################################################################
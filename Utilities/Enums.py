@@ -16,15 +16,6 @@ class ServiceAccountSheet(_EnumBase):
     DuctCleaning = "Duct Cleaning"
     Other = "Other"
 
-################################################################################
-class HighlightColor(_EnumBase):
-
-    Yellow = "#FFFF00"
-    Green = "#34A853"
-    Red = "#FF0000"
-    Pink = "#EAD1DC"
-    Orange = "#FBBC04"
-
 ################################################################################
 class Dimension(_EnumBase):
 
@@ -51,3 +42,17 @@ class GridRangeType(_EnumBase):
     ListOfLists = "ListOfLists"
 
 ################################################################################
+class ChangeKind(_EnumBase):
+
+    Insert = "insert"
+    Delete = "delete"
+    Amount = "amount"
+    Memos = "memos"
+    Names = "names"
+    CSR = "csr"
+    Expiry = "expiry"
+    Highlight = "highlight"
+    # The loaded cells don't show what the record renders
+    Display = "display"
+
+################################################################################
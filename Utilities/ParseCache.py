@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+################################################################################
+
+__all__ = ("ParsedAccountName", "NameParseCache", "NAME_PARSE_CACHE")
+
+# Customer strings repeat across every export and every sheet, so this only
+# needs to hold roughly the number of distinct customers.
+DEFAULT_MAX_SIZE = 50_000
+
+################################################################################
+class ParsedAccountName(NamedTuple):
+
+    account_id: int
+    name: str
+    # (first_name, last_name, raw) per member, as returned by split_multi_names
+    members: Tuple[Tuple[str, Optional[str], str], ...]
+
+################################################################################
+class NameParseCache:
+    """Bounded LRU cache of parsed '<names> <account ID>' strings."""
+
+    __slots__ = (
+        "_entries",
+        "_max_size",
+        "_lock",
+        "hits",
+        "misses",
+    )
+
+################################################################################
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+
+        self._entries: OrderedDict[str, Optional[ParsedAccountName]] = OrderedDict()
+        self._max_size: int = max_size
+        self._lock: threading.Lock = threading.Lock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+################################################################################
+    def __len__(self) -> int:
+
+        return len(self._entries)
+
+################################################################################
+    def get_or_parse(
+        self,
+        raw: str,
+        parser: Callable[[str], Optional[ParsedAccountName]]
+    ) -> Optional[ParsedAccountName]:
+
+        with self._lock:
+            if raw in self._entries:
+                self._entries.move_to_end(raw)
+                self.hits += 1
+                return self._entries[raw]
+
+        result = parser(raw)
+
+        with self._lock:
+            self.misses += 1
+            self._store(raw, result)
+
+        return result
+
+################################################################################
+    def seed(self, entries: Iterable[Tuple[str, ParsedAccountName]]) -> None:
+        """Adds previously persisted entries without counting them as lookups."""
+
+        with self._lock:
+            for raw, parsed in entries:
+                self._store(raw, parsed)
+
+################################################################################
+    def items(self) -> Iterator[Tuple[str, ParsedAccountName]]:
+        """Successfully parsed entries, least recently used first."""
+
+        with self._lock:
+            snapshot = list(self._entries.items())
+
+        return ((raw, parsed) for raw, parsed in snapshot if parsed is not None)
+
+################################################################################
+    def clear(self) -> None:
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+################################################################################
+    def _store(self, raw: str, parsed: Optional[ParsedAccountName]) -> None:
+
+        self._entries[raw] = parsed
+        self._entries.move_to_end(raw)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+################################################################################
+
+NAME_PARSE_CACHE = NameParseCache()
+
+################################################################################
@@ -6,6 +6,8 @@ from datetime import date
 from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Union, Tuple, Dict
 from urllib.parse import quote
 
+from .ParseCache import NAME_PARSE_CACHE, ParsedAccountName
+
 if TYPE_CHECKING:
     from App.Classes import MemberName
 ################################################################################
@@ -89,6 +91,13 @@ class Utilities:
 
         return False, default
 
+################################################################################
+    @staticmethod
+    def to_cents(amount: Union[int, float]) -> int:
+        """Converts a dollar amount to integer cents for exact comparisons."""
+
+        return int(round(amount * 100))
+
 ################################################################################
     @staticmethod
     def split_name_and_account(raw: str) -> Optional[Tuple[int, str]]:
@@ -156,6 +165,34 @@ class Utilities:
 
         return member_names
 
+################################################################################
+    @staticmethod
+    def parse_account_name(raw: str) -> Optional[ParsedAccountName]:
+        """
+        Combines split_name_and_account and split_multi_names. Results are
+        memoized by the raw string in NAME_PARSE_CACHE.
+
+        Returns:
+            A ParsedAccountName if parsing is successful,
+            None if parsing fails.
+        """
+        return NAME_PARSE_CACHE.get_or_parse(raw, Utilities._parse_account_name)
+
+################################################################################
+    @staticmethod
+    def _parse_account_name(raw: str) -> Optional[ParsedAccountName]:
+
+        split_result = Utilities.split_name_and_account(raw)
+        if split_result is None:
+            return None
+
+        account_id, name_without_id = split_result
+        return ParsedAccountName(
+            account_id=account_id,
+            name=name_without_id,
+            members=tuple(Utilities.split_multi_names(name_without_id))
+        )
+
 ################################################################################
     @staticmethod
     def columns_in_range(range_str: str) -> int:
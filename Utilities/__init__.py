@@ -1,2 +1,4 @@
+from .Colors import Color, ColorPalette, WHITE
+from .ParseCache import NAME_PARSE_CACHE, ParsedAccountName
 from .Utilities import Utilities
 ################################################################################
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Database.Engine reads its URL at import time, so point it at a scratch
+# database before any App module is imported.
+os.environ["DEBUG"] = "True"
+os.environ["DEV_DB_URL"] = f"sqlite+pysqlite:///{Path(tempfile.mkdtemp()) / 'tests.sqlite3'}"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
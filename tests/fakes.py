@@ -0,0 +1,555 @@
+from __future__ import annotations
+
+import copy
+import csv
+import json
+import random
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from GClient.BatchPlanner import BatchPlanner
+from GClient.Client import GSheetsClient
+from Utilities.Colors import Color
+################################################################################
+
+__all__ = (
+    "FakeSheets",
+    "FakeClient",
+    "ScriptedClient",
+    "make_response",
+    "StubRules",
+    "StubSignal",
+    "make_payload",
+    "write_qb_export",
+    "displayed",
+    "fetched_cell",
+)
+
+# Shared by the generated sheets and QB export, so records match up
+FIRST_NAMES = ("John", "Mary", "Bob", "Sue", "Al", "Jo")
+LAST_NAMES = ("Smith", "Jones", "Brown", "Lee")
+ACCOUNTS = tuple(range(1000, 1060))
+AMOUNTS = (89.0, 129.0, 189.0, 25.0, 240.0, 15.0)
+
+WHITE = {"red": 1.0, "green": 1.0, "blue": 1.0}
+COLORS = (WHITE, {"red": 1.0, "green": 1.0}, {"red": 0.2039, "green": 0.6588, "blue": 0.3254})
+THEME_COLOR = {"red": 0.5, "green": 0.25}
+
+################################################################################
+def _get(cell: Dict[str, Any], path: str) -> Any:
+
+    for part in path.split("."):
+        if not isinstance(cell, dict) or part not in cell:
+            return None
+        cell = cell[part]
+    return cell
+
+################################################################################
+def _set(cell: Dict[str, Any], path: str, value: Any) -> None:
+
+    parts = path.split(".")
+    for part in parts[:-1]:
+        cell = cell.setdefault(part, {})
+    if value is None:
+        cell.pop(parts[-1], None)
+    else:
+        cell[parts[-1]] = copy.deepcopy(value)
+
+################################################################################
+def apply_mask(cell: Optional[Dict[str, Any]], src: Dict[str, Any], fields: Optional[str]) -> Dict[str, Any]:
+    """Writes ``src`` over ``cell`` as the API does for a request's field mask."""
+
+    if fields in ("*", None):
+        return copy.deepcopy(src)
+
+    cell = copy.deepcopy(cell) if cell else {}
+    for path in fields.split(","):
+        path = path.strip()
+        _set(cell, path, _get(src, path))
+    return cell
+
+################################################################################
+class FakeSheets:
+    """
+    An in-memory spreadsheet that applies the batchUpdate requests the
+    writeback sends. Only the parts of each request the app uses are modeled.
+    """
+
+    def __init__(self) -> None:
+
+        # sheetId -> title, grid size, frozen rows, {(row, col): cell} and {col: pixels}
+        self.sheets: Dict[int, Dict[str, Any]] = {}
+        self.next_id: int = 1000
+        # Request kind -> number applied
+        self.applied: Counter[str] = Counter()
+        self._lock: threading.RLock = threading.RLock()
+
+################################################################################
+    def add_tab(self, sheet_id: int, title: str, row_count: int, column_count: int = 26) -> Dict[str, Any]:
+
+        tab = self.sheets[sheet_id] = {
+            "title": title,
+            "rowCount": row_count,
+            "colCount": column_count,
+            "frozen": 0,
+            "cells": {},
+            "colSizes": {},
+        }
+        return tab
+
+################################################################################
+    def batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+
+        requests = body["requests"]
+        if isinstance(requests, dict):
+            requests = [requests]
+
+        with self._lock:
+            return {"replies": [self.apply(request) or {} for request in requests]}
+
+################################################################################
+    def apply(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+
+        (kind, body), = request.items()
+        self.applied[kind] += 1
+        return getattr(self, f"_op_{kind}")(body)
+
+################################################################################
+    def state(self) -> Dict[str, Any]:
+        """Every tab's contents by title, comparable with ==."""
+
+        return {
+            tab["title"]: {
+                "rows": tab["rowCount"],
+                "cols": tab["colCount"],
+                "frozen": tab["frozen"],
+                "colSizes": sorted(tab["colSizes"].items()),
+                "cells": sorted(
+                    (r, c, json.dumps(v, sort_keys=True))
+                    for (r, c), v in tab["cells"].items()
+                ),
+            }
+            for tab in self.sheets.values()
+        }
+
+################################################################################
+    def _write(self, tab: Dict[str, Any], row: int, col: int, src: Dict[str, Any], fields: Optional[str]) -> None:
+
+        cell = apply_mask(tab["cells"].get((row, col)), src, fields)
+        if cell:
+            tab["cells"][(row, col)] = cell
+        else:
+            tab["cells"].pop((row, col), None)
+
+        tab["rowCount"] = max(tab["rowCount"], row + 1)
+        tab["colCount"] = max(tab["colCount"], col + 1)
+
+################################################################################
+    def _op_addSheet(self, body: Dict[str, Any]) -> Dict[str, Any]:
+
+        props = body["properties"]
+        sheet_id = props.get("sheetId")
+        if sheet_id is None:
+            sheet_id = self.next_id
+            self.next_id += 1
+        assert sheet_id not in self.sheets
+        assert all(tab["title"] != props["title"] for tab in self.sheets.values()), props["title"]
+
+        grid = props.get("gridProperties", {})
+        tab = self.add_tab(sheet_id, props["title"], grid.get("rowCount", 1000), grid.get("columnCount", 26))
+        tab["frozen"] = grid.get("frozenRowCount", 0)
+
+        return {"addSheet": {"properties": {
+            "sheetId": sheet_id,
+            "title": tab["title"],
+            "gridProperties": {"rowCount": tab["rowCount"], "columnCount": tab["colCount"]},
+        }}}
+
+################################################################################
+    def _op_duplicateSheet(self, body: Dict[str, Any]) -> Dict[str, Any]:
+
+        sheet_id = body.get("newSheetId")
+        if sheet_id is None:
+            sheet_id = self.next_id
+            self.next_id += 1
+
+        tab = self.sheets[sheet_id] = copy.deepcopy(self.sheets[body["sourceSheetId"]])
+        tab["title"] = body["newSheetName"]
+
+        return {"duplicateSheet": {"properties": {
+            "sheetId": sheet_id,
+            "title": tab["title"],
+            "gridProperties": {"rowCount": tab["rowCount"], "columnCount": tab["colCount"]},
+        }}}
+
+################################################################################
+    def _op_appendCells(self, body: Dict[str, Any]) -> None:
+
+        tab = self.sheets[body["sheetId"]]
+        first = max((r for (r, _), cell in tab["cells"].items() if cell), default=-1) + 1
+        for i, row in enumerate(body.get("rows", [])):
+            for j, value in enumerate(row.get("values", [])):
+                self._write(tab, first + i, j, value, body.get("fields", "*"))
+
+################################################################################
+    def _op_updateCells(self, body: Dict[str, Any]) -> None:
+
+        rows = body.get("rows", [])
+        if "start" in body:
+            start = body["start"]
+            tab = self.sheets[start["sheetId"]]
+            r0, c0 = start.get("rowIndex", 0), start.get("columnIndex", 0)
+            for i, row in enumerate(rows):
+                for j, value in enumerate(row.get("values", [])):
+                    self._write(tab, r0 + i, c0 + j, value, body["fields"])
+            return
+
+        grid = body["range"]
+        tab = self.sheets[grid["sheetId"]]
+        r0, c0 = grid.get("startRowIndex", 0), grid.get("startColumnIndex", 0)
+        for r in range(r0, grid.get("endRowIndex", tab["rowCount"])):
+            values = rows[r - r0].get("values", []) if r - r0 < len(rows) else []
+            for c in range(c0, grid.get("endColumnIndex", tab["colCount"])):
+                value = values[c - c0] if c - c0 < len(values) else {}
+                self._write(tab, r, c, value, body["fields"])
+
+################################################################################
+    def _op_repeatCell(self, body: Dict[str, Any]) -> None:
+
+        grid = body["range"]
+        tab = self.sheets[grid["sheetId"]]
+        for r in range(grid.get("startRowIndex", 0), grid.get("endRowIndex", tab["rowCount"])):
+            for c in range(grid.get("startColumnIndex", 0), grid.get("endColumnIndex", tab["colCount"])):
+                self._write(tab, r, c, body["cell"], body["fields"])
+
+################################################################################
+    def _op_updateDimensionProperties(self, body: Dict[str, Any]) -> None:
+
+        grid = body["range"]
+        assert grid["dimension"] == "COLUMNS"
+        tab = self.sheets[grid["sheetId"]]
+        for c in range(grid["startIndex"], grid["endIndex"]):
+            tab["colSizes"][c] = body["properties"]["pixelSize"]
+
+################################################################################
+    def _op_deleteDimension(self, body: Dict[str, Any]) -> None:
+
+        grid = body["range"]
+        tab = self.sheets[grid["sheetId"]]
+        start, end = grid["startIndex"], grid["endIndex"]
+        count = end - start
+        if count <= 0:
+            return
+
+        def shift(i: int) -> int:
+            return i if i < start else i - count
+
+        if grid["dimension"] == "ROWS":
+            tab["cells"] = {(shift(r), c): v for (r, c), v in tab["cells"].items() if not start <= r < end}
+            tab["rowCount"] -= count
+        else:
+            tab["cells"] = {(r, shift(c)): v for (r, c), v in tab["cells"].items() if not start <= c < end}
+            tab["colSizes"] = {shift(c): v for c, v in tab["colSizes"].items() if not start <= c < end}
+            tab["colCount"] -= count
+
+################################################################################
+    def _op_insertDimension(self, body: Dict[str, Any]) -> None:
+
+        grid = body["range"]
+        assert grid["dimension"] == "ROWS"
+        tab = self.sheets[grid["sheetId"]]
+        start, count = grid["startIndex"], grid["endIndex"] - grid["startIndex"]
+        tab["cells"] = {((r if r < start else r + count), c): v for (r, c), v in tab["cells"].items()}
+        tab["rowCount"] += count
+
+################################################################################
+    def _op_appendDimension(self, body: Dict[str, Any]) -> None:
+
+        tab = self.sheets[body["sheetId"]]
+        tab["rowCount" if body["dimension"] == "ROWS" else "colCount"] += body["length"]
+
+################################################################################
+    def _op_updateSheetProperties(self, body: Dict[str, Any]) -> None:
+
+        props = body["properties"]
+        tab = self.sheets[props["sheetId"]]
+        for field in body["fields"].split(","):
+            field = field.strip()
+            if field == "title":
+                tab["title"] = props["title"]
+            elif field == "gridProperties.rowCount":
+                tab["rowCount"] = props["gridProperties"]["rowCount"]
+                tab["cells"] = {k: v for k, v in tab["cells"].items() if k[0] < tab["rowCount"]}
+            elif field == "gridProperties.columnCount":
+                tab["colCount"] = props["gridProperties"]["columnCount"]
+                tab["cells"] = {k: v for k, v in tab["cells"].items() if k[1] < tab["colCount"]}
+                tab["colSizes"] = {k: v for k, v in tab["colSizes"].items() if k < tab["colCount"]}
+            elif field == "gridProperties.frozenRowCount":
+                tab["frozen"] = props["gridProperties"]["frozenRowCount"]
+            else:
+                raise NotImplementedError(field)
+
+################################################################################
+class FakeClient:
+    """Stands in for GSheetsFacade's write methods, backed by a FakeSheets."""
+
+    def __init__(self, server: Optional[FakeSheets] = None, max_bytes: int = 2_000_000) -> None:
+
+        self.server: FakeSheets = server or FakeSheets()
+        self.max_bytes: int = max_bytes
+
+################################################################################
+    def spreadsheet_get(self, spreadsheet_id: str, ranges: List[str] = None, include_grid_data: bool = False,
+                        fields: Optional[str] = None, **_) -> Dict[str, Any]:
+        # Only tab properties are served; grids are loaded from generated payloads
+        assert not include_grid_data
+        return {"sheets": [
+            {"properties": {"sheetId": sheet_id, "title": tab["title"]}}
+            for sheet_id, tab in self.server.sheets.items()
+        ]}
+
+################################################################################
+    def batch_update_spreadsheet(self, spreadsheet_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+
+        return self.server.batch(body)
+
+################################################################################
+    def batch_update_chunked(self, spreadsheet_id: str, requests: Sequence[Dict[str, Any]], **_) -> Dict[str, Any]:
+
+        replies: List[Dict[str, Any]] = []
+        for pieces in BatchPlanner(self.max_bytes).plan(requests):
+            # Round trip through the encoded body, as the real client sends it
+            body = BatchPlanner.body(pieces)
+            # The API rejects bodies over its limit
+            assert len(body) <= self.max_bytes, f"{len(body)} byte batchUpdate body"
+            replies.extend(self.server.batch(json.loads(body))["replies"])
+        return {"replies": replies}
+
+################################################################################
+class ScriptedSession:
+    """Stands in for an AuthorizedSession, answering with scripted responses and exceptions in order."""
+
+    def __init__(self, outcomes: Sequence[Any]) -> None:
+
+        self.outcomes: List[Any] = list(outcomes)
+        self.sent: List[Tuple[str, str]] = []
+
+################################################################################
+    def request(self, method: str, url: str, **_) -> requests.Response:
+
+        self.sent.append((method, url))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+################################################################################
+class ScriptedClient(GSheetsClient):
+    """A real GSheetsClient over a ScriptedSession, with credentials that never need refreshing."""
+
+    class _Credentials:
+        valid = True
+
+    def __init__(self, *outcomes: Any, **kwargs: Any) -> None:
+
+        # A large quota, so the rate limiter never waits
+        super().__init__(requests_per_minute=60_000, **kwargs)
+        self.session: ScriptedSession = ScriptedSession(outcomes)
+        self._session = self.session
+
+################################################################################
+    @staticmethod
+    def _build_credentials(svc_account_file: str) -> Any:
+
+        return ScriptedClient._Credentials()
+
+################################################################################
+class StubRules:
+    """Routes by amount like a typical rule table, without the database."""
+
+################################################################################
+    @staticmethod
+    def get_target_sheet(record: Any) -> str:
+
+        return StubRules._route(abs(record.amount))
+
+################################################################################
+    @staticmethod
+    def route_amounts(amounts: Sequence[float]) -> List[str]:
+
+        return [StubRules._route(abs(a)) for a in amounts]
+
+################################################################################
+    @staticmethod
+    def _route(amount: float) -> str:
+
+        if amount >= 180:
+            return "Annual"
+        if amount >= 120:
+            return "Plumbing - Annual"
+        if amount == 25:
+            return "Generator"
+        if amount == 15:
+            return "Duct Cleaning"
+        return "Monthly"
+
+################################################################################
+class StubSignal:
+    """Collects what would be emitted to the UI."""
+
+    def __init__(self) -> None:
+
+        self.emitted: List[Tuple[Any, ...]] = []
+
+################################################################################
+    def emit(self, *args: Any) -> None:
+
+        self.emitted.append(args)
+
+################################################################################
+def _cell(value: Optional[str], color: Dict[str, float], *, theme: bool = False) -> Dict[str, Any]:
+
+    style = {"themeColor": "ACCENT1"} if theme else {"rgbColor": color}
+    cell: Dict[str, Any] = {"effectiveFormat": {"backgroundColorStyle": style}}
+    if value is not None:
+        cell["formattedValue"] = value
+    return cell
+
+################################################################################
+def _make_sheet(rng: random.Random, title: str, sheet_id: int, columns: int, rows: int) -> Dict[str, Any]:
+
+    row_data = [{"values": [_cell("Name", WHITE), _cell("Membership Type", WHITE)] + [_cell("x", WHITE)] * (columns - 2)}]
+    for _ in range(rows):
+        account = rng.choice(ACCOUNTS)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {account}"
+        if rng.random() < 0.03:
+            name = "Bad Name"
+        amount = f"${rng.choice(AMOUNTS):.2f}"
+        if rng.random() < 0.02:
+            amount = "abc"
+
+        color = rng.choice(COLORS)
+        values = [_cell(name, color, theme=rng.random() < 0.1), _cell("Memo", color), _cell(amount, color)]
+        if columns > 3:
+            expiry = date(2025, 1, 1) + timedelta(days=rng.randint(0, 400))
+            values.append(_cell(expiry.strftime("%m/%d/%Y") if rng.random() < 0.8 else "N/A", color))
+        while len(values) < columns:
+            values.append(_cell(rng.choice(("", "csr", "note")), rng.choice(COLORS)))
+        row_data.append({"values": values})
+
+    # Pre-allocated blank rows
+    row_data.extend({"values": [_cell(None, WHITE)] * columns} for _ in range(5))
+
+    return {
+        "properties": {
+            "title": title,
+            "sheetId": sheet_id,
+            "gridProperties": {"rowCount": rows + 10, "columnCount": 26},
+        },
+        "data": [{
+            "rowData": row_data,
+            "columnMetadata": [{"pixelSize": 100 + (i // 3) * 10} for i in range(columns)],
+        }],
+    }
+
+################################################################################
+def make_payload(seed: int, suffix: str = "") -> Dict[str, Any]:
+    """A spreadsheets.get response with the five relevant tabs, titled with ``suffix``."""
+
+    rng = random.Random(seed)
+    return {
+        "spreadsheetId": "SPREADSHEET",
+        "properties": {
+            "title": "Service Accounts",
+            "spreadsheetTheme": {"themeColors": [{"colorType": "ACCENT1", "color": {"rgbColor": THEME_COLOR}}]},
+        },
+        "sheets": [
+            _make_sheet(rng, f"Annual{suffix}", 1, 11, 300),
+            _make_sheet(rng, f"Monthly{suffix}", 2, 10, 300),
+            _make_sheet(rng, f"Plumbing - Annual{suffix}", 3, 11, 60),
+            _make_sheet(rng, f"Generator{suffix}", 4, 3, 40),
+            _make_sheet(rng, f"Duct Cleaning{suffix}", 5, 4, 40),
+        ],
+    }
+
+################################################################################
+def write_qb_export(path: Path, seed: int, count: int = 1500, *, grouped: bool = True) -> Path:
+    """
+    A QuickBooks export CSV. Rows are grouped by invoice date, as QuickBooks
+    writes them, unless ``grouped`` is False.
+    """
+
+    rng = random.Random(seed)
+    rows: List[Dict[str, str]] = []
+    for i in range(count):
+        account = rng.choice(ACCOUNTS + (9999,))
+        amount = rng.choice(AMOUNTS) * rng.choice((1, -1, -1)) if rng.random() > 0.02 else 0.0
+        invoice_date = date(2025, 6, 1) + timedelta(days=rng.randint(0, 20))
+        rows.append({
+            "Type": "Invoice",
+            "Date": invoice_date.strftime("%m/%d/%Y"),
+            "Num": str(i),
+            "Name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {account}",
+            "Memo": "Service",
+            "Amount": f"{amount:.2f}",
+        })
+    if grouped:
+        rows.sort(key=lambda row: row["Date"])
+
+    with open(path, "w", encoding="cp1252", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    return path
+
+################################################################################
+def make_response(status: int, body: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body or {}).encode("utf-8")
+    response.headers.update(headers or {})
+    return response
+
+################################################################################
+def displayed(cell: Dict[str, Any]) -> Tuple[str, Color]:
+    """A grid cell's text and background as the app reads them back."""
+
+    value = cell.get("userEnteredValue", {})
+    number = value.get("numberValue", value.get("number_value"))
+    if "stringValue" in value:
+        text = value["stringValue"]
+    elif number is not None:
+        # The only number format the app writes is currency
+        text = f"${float(number):,.2f}"
+    else:
+        text = ""
+
+    style = cell.get("userEnteredFormat", {}).get("backgroundColorStyle")
+    if style is None:
+        color = Color.from_api(WHITE)
+    elif "themeColor" in style:
+        color = Color.from_api(THEME_COLOR)
+    else:
+        color = Color.from_api(style["rgbColor"])
+
+    return text, color
+
+################################################################################
+def fetched_cell(cell: Dict[str, Any]) -> Dict[str, Any]:
+    """What the load's field mask returns for a grid cell."""
+
+    text, _ = displayed(cell)
+    style = cell.get("userEnteredFormat", {}).get("backgroundColorStyle", {"rgbColor": WHITE})
+    fetched: Dict[str, Any] = {"effectiveFormat": {"backgroundColorStyle": style}}
+    if text:
+        fetched["formattedValue"] = text
+    return fetched
+
+################################################################################
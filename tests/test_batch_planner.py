@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from GClient.BatchPlanner import BatchPlanner
+from fakes import FakeSheets
+################################################################################
+
+SHEET_ID = 7
+
+################################################################################
+def _rows(count: int, width: int = 6) -> List[Dict[str, Any]]:
+
+    return [
+        {"values": [{"userEnteredValue": {"stringValue": f"r{r}c{c}" * 4}} for c in range(width)]}
+        for r in range(count)
+    ]
+
+################################################################################
+def _apply(requests: List[Dict[str, Any]], max_bytes: int) -> Dict[str, Any]:
+    """Applies the planned batches to a tab with some existing cells and returns its state."""
+
+    server = FakeSheets()
+    tab = server.add_tab(SHEET_ID, "Sheet", 300)
+    for r in range(150):
+        for c in range(8):
+            tab["cells"][(r, c)] = {"userEnteredValue": {"stringValue": "old"}}
+
+    for pieces in BatchPlanner(max_bytes).plan(requests):
+        body = BatchPlanner.body(pieces)
+        assert len(body) <= max_bytes
+        server.batch(json.loads(body))
+
+    return server.state()
+
+################################################################################
+@pytest.mark.parametrize("request_", [
+    # A range covering more rows than are given, so the rest are cleared
+    {"updateCells": {
+        "range": {"sheetId": SHEET_ID, "startRowIndex": 3, "endRowIndex": 140, "startColumnIndex": 0, "endColumnIndex": 6},
+        "rows": _rows(120),
+        "fields": "*",
+    }},
+    {"updateCells": {
+        "start": {"sheetId": SHEET_ID, "rowIndex": 10, "columnIndex": 1},
+        "rows": _rows(120),
+        "fields": "userEnteredValue",
+    }},
+], ids=["range", "start"])
+def test_oversized_update_cells_is_split_by_row_range(request_: Dict[str, Any]) -> None:
+
+    whole = _apply([request_], 10_000_000)
+    split = _apply([request_], 4_000)
+
+    assert len(list(BatchPlanner(4_000).plan([request_]))) > 1
+    assert split == whole
+
+################################################################################
+def test_oversized_append_cells_is_split_in_order() -> None:
+
+    request = {"appendCells": {"sheetId": SHEET_ID, "rows": _rows(120), "fields": "*"}}
+
+    whole = _apply([request], 10_000_000)
+    split = _apply([request], 4_000)
+
+    pieces = [json.loads(piece) for batch in BatchPlanner(4_000).plan([request]) for piece in batch]
+    assert len(pieces) > 1
+    assert [row for piece in pieces for row in piece["appendCells"]["rows"]] == request["appendCells"]["rows"]
+    assert split == whole
+
+################################################################################
+def test_batches_are_packed_in_order_within_the_budget() -> None:
+
+    requests = [
+        {"repeatCell": {"range": {"sheetId": SHEET_ID, "startRowIndex": i}, "fields": "userEnteredFormat"}}
+        if i % 3 else
+        {"appendCells": {"sheetId": SHEET_ID, "rows": _rows(i % 7 + 1), "fields": "*"}}
+        for i in range(200)
+    ]
+
+    batches = list(BatchPlanner(5_000).plan(requests))
+
+    assert len(batches) > 1
+    assert all(len(BatchPlanner.body(batch)) <= 5_000 for batch in batches)
+    # Nothing is reordered or split, and each batch is as full as it can be
+    assert [json.loads(piece) for batch in batches for piece in batch] == requests
+    for batch, following in zip(batches, batches[1:]):
+        assert len(BatchPlanner.body(batch + following[:1])) > 5_000
+
+################################################################################
+def test_body_may_use_the_whole_budget() -> None:
+
+    requests = [{"appendCells": {"sheetId": SHEET_ID, "rows": _rows(1)}} for _ in range(2)]
+    size = len(BatchPlanner.body([BatchPlanner.encode(r) for r in requests]))
+
+    assert len(list(BatchPlanner(size).plan(requests))) == 1
+    assert len(list(BatchPlanner(size - 1).plan(requests))) == 2
+
+################################################################################
+def test_request_too_large_to_split_is_passed_through() -> None:
+
+    # A single row can't be split further; the API rejects it rather than the planner
+    request = {"appendCells": {"sheetId": SHEET_ID, "rows": _rows(1, width=200), "fields": "*"}}
+
+    assert list(BatchPlanner(1_000).plan([request])) == [[BatchPlanner.encode(request)]]
+
+################################################################################
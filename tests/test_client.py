@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+import requests
+from urllib3.exceptions import NewConnectionError
+
+import GClient.Client
+from GClient.Exceptions import GSheetsBadRequestError, GSheetsServerError
+from fakes import ScriptedClient, make_response
+################################################################################
+
+URL = "https://sheets.googleapis.com/v4/spreadsheets/SPREADSHEET"
+RATE_LIMITED = {"error": {"message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+UNAVAILABLE = {"error": {"message": "Backend unavailable", "status": "UNAVAILABLE"}}
+
+################################################################################
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """The client's backoff delays, recorded instead of slept."""
+
+    delays: List[float] = []
+    monkeypatch.setattr(GClient.Client, "time", SimpleNamespace(sleep=delays.append, perf_counter=time.perf_counter))
+    return delays
+
+################################################################################
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_rate_limited_requests_are_retried(method: str, sleeps: List[float]) -> None:
+
+    client = ScriptedClient(make_response(429, RATE_LIMITED), make_response(200, {"ok": True}))
+
+    assert client.request(method, URL).json() == {"ok": True}
+    assert client.session.sent == [(method, URL)] * 2
+    assert len(sleeps) == 1
+
+################################################################################
+def test_retry_after_header_sets_the_delay(sleeps: List[float]) -> None:
+
+    client = ScriptedClient(make_response(429, RATE_LIMITED, {"Retry-After": "7"}), make_response(200))
+
+    client.request("POST", URL)
+    assert sleeps == [7.0]
+
+################################################################################
+def test_server_errors_are_retried_for_reads(sleeps: List[float]) -> None:
+
+    client = ScriptedClient(make_response(503, UNAVAILABLE), make_response(500), make_response(200))
+
+    assert client.request("GET", URL).ok
+    assert len(client.session.sent) == 3
+
+################################################################################
+def test_server_errors_are_not_retried_for_writes(sleeps: List[float]) -> None:
+
+    client = ScriptedClient(make_response(503, UNAVAILABLE), make_response(200))
+
+    with pytest.raises(GSheetsServerError):
+        client.request("POST", URL)
+    assert len(client.session.sent) == 1
+    assert sleeps == []
+
+################################################################################
+def test_client_errors_are_not_retried(sleeps: List[float]) -> None:
+
+    client = ScriptedClient(make_response(400), make_response(200))
+
+    with pytest.raises(GSheetsBadRequestError):
+        client.request("GET", URL)
+    assert len(client.session.sent) == 1
+
+################################################################################
+def test_retries_stop_after_max_retries(sleeps: List[float]) -> None:
+
+    client = ScriptedClient(*(make_response(503) for _ in range(4)), max_retries=2)
+
+    with pytest.raises(GSheetsServerError):
+        client.request("GET", URL)
+    assert len(client.session.sent) == 3
+    assert len(sleeps) == 2
+
+################################################################################
+@pytest.mark.parametrize("failure", [
+    requests.ConnectTimeout(),
+    requests.ConnectionError(SimpleNamespace(reason=NewConnectionError(None, "refused"))),
+], ids=["connect_timeout", "refused"])
+def test_writes_that_never_reached_the_server_are_retried(failure: Exception, sleeps: List[float]) -> None:
+
+    client = ScriptedClient(failure, make_response(200))
+
+    assert client.request("POST", URL).ok
+    assert len(client.session.sent) == 2
+
+################################################################################
+def test_timeouts_are_retried_for_reads(sleeps: List[float]) -> None:
+
+    client = ScriptedClient(requests.ReadTimeout(), make_response(200))
+
+    assert client.request("GET", URL).ok
+    assert len(client.session.sent) == 2
+
+################################################################################
+def test_writes_that_may_have_reached_the_server_are_not_retried(sleeps: List[float]) -> None:
+
+    client = ScriptedClient(requests.ReadTimeout(), make_response(200))
+
+    with pytest.raises(requests.ReadTimeout):
+        client.request("POST", URL)
+    assert len(client.session.sent) == 1
+
+################################################################################
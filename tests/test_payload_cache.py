@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from cryptography.fernet import Fernet
+
+from GClient.Client import DRIVE_FILE_URL, SPREADSHEET_URL
+from GClient.PayloadCache import PayloadCache
+from fakes import ScriptedClient, make_payload, make_response
+################################################################################
+
+SPREADSHEET = "SPREADSHEET"
+DRIVE = ("GET", DRIVE_FILE_URL.format(fileId=SPREADSHEET))
+SHEETS = ("GET", SPREADSHEET_URL.format(spreadsheetId=SPREADSHEET))
+
+################################################################################
+@pytest.fixture
+def cache(tmp_path: Path) -> PayloadCache:
+
+    return PayloadCache(tmp_path, Fernet(Fernet.generate_key()))
+
+################################################################################
+def _revision(version: str) -> Any:
+
+    return make_response(200, {"version": version, "modifiedTime": "2025-06-01T12:00:00.000Z"})
+
+################################################################################
+def _get(client: ScriptedClient, **kwargs: Any) -> Dict[str, Any]:
+
+    return client.spreadsheet_get(SPREADSHEET, include_grid_data=True, use_cache=True, **kwargs)
+
+################################################################################
+def test_unchanged_revision_is_served_from_cache(cache: PayloadCache, tmp_path: Path) -> None:
+
+    payload = make_payload(seed=1)
+    client = ScriptedClient(_revision("1"), make_response(200, payload), _revision("1"), payload_cache=cache)
+
+    assert _get(client) == payload
+    assert _get(client) == payload
+    assert client.session.sent == [DRIVE, SHEETS, DRIVE]
+
+    # Stored encrypted, since grids hold customer names
+    (entry,) = tmp_path.iterdir()
+    assert b"Smith" not in entry.read_bytes()
+
+################################################################################
+def test_new_revision_is_refetched(cache: PayloadCache) -> None:
+
+    old, new = make_payload(seed=1), make_payload(seed=2)
+    client = ScriptedClient(
+        _revision("1"), make_response(200, old),
+        _revision("2"), make_response(200, new),
+        _revision("2"),
+        payload_cache=cache,
+    )
+
+    assert _get(client) == old
+    assert _get(client) == new
+    assert _get(client) == new
+    assert client.session.sent == [DRIVE, SHEETS, DRIVE, SHEETS, DRIVE]
+
+################################################################################
+def test_other_requests_are_cached_separately(cache: PayloadCache) -> None:
+
+    client = ScriptedClient(
+        _revision("1"), make_response(200, {"sheets": []}),
+        _revision("1"), make_response(200, {"sheets": [{}]}),
+        payload_cache=cache,
+    )
+
+    assert _get(client) == {"sheets": []}
+    assert _get(client, fields="sheets.properties") == {"sheets": [{}]}
+    assert client.session.sent == [DRIVE, SHEETS, DRIVE, SHEETS]
+
+################################################################################
+def test_unreadable_entry_is_refetched(cache: PayloadCache, tmp_path: Path) -> None:
+
+    payload = make_payload(seed=1)
+    client = ScriptedClient(
+        _revision("1"), make_response(200, {"stale": True}),
+        _revision("1"), make_response(200, payload),
+        _revision("1"),
+        payload_cache=cache,
+    )
+
+    _get(client)
+    (entry,) = tmp_path.iterdir()
+    entry.write_bytes(b"not a cache entry")
+
+    assert _get(client) == payload
+    # The refetched payload replaces the unreadable entry
+    assert _get(client) == payload
+    assert client.session.sent == [DRIVE, SHEETS, DRIVE, SHEETS, DRIVE]
+
+################################################################################
+def test_drive_failure_falls_back_to_sheets(cache: PayloadCache, tmp_path: Path) -> None:
+
+    payload = make_payload(seed=1)
+    client = ScriptedClient(make_response(403), make_response(200, payload), payload_cache=cache)
+
+    assert _get(client) == payload
+    assert client.session.sent == [DRIVE, SHEETS]
+    # Without a revision there is nothing to check an entry against later
+    assert list(tmp_path.iterdir()) == []
+
+################################################################################
+def test_cache_is_only_used_when_asked(cache: PayloadCache) -> None:
+
+    client = ScriptedClient(make_response(200, {"sheets": []}), payload_cache=cache)
+
+    assert client.spreadsheet_get(SPREADSHEET, include_grid_data=True) == {"sheets": []}
+    assert client.session.sent == [SHEETS]
+
+################################################################################
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+import App.Reconciler
+from App.Reconciler import ServiceReconciler
+from App.Spreadsheet import Spreadsheet
+from fakes import StubRules, StubSignal, make_payload, write_qb_export
+################################################################################
+def _reconcile(
+    export: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    **kwargs: Any
+) -> Dict[str, Any]:
+    """Reconciles the export into a generated spreadsheet and returns what would be written."""
+
+    monkeypatch.setattr(App.Reconciler, "get_client", lambda: None)
+
+    reconciler = ServiceReconciler(StubRules())
+    reconciler._spreadsheet = spreadsheet = Spreadsheet(None, make_payload(seed=3), None)
+    reconciler.load_qb_export(export, **kwargs)
+    reconciler.reconcile_all(StubSignal(), StubSignal())
+
+    return {
+        "streamed": reconciler._qb_stream is not None,
+        "sheets": {
+            sheet.title: sheet.append_cells_payload(100 + sheet.id)
+            for sheet in spreadsheet._sheets
+        },
+        "errors": reconciler.format_all_errors(42),
+    }
+
+################################################################################
+def test_streamed_reconcile_matches_loaded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    export = write_qb_export(tmp_path / "qb.csv", seed=3)
+
+    loaded = _reconcile(export, monkeypatch)
+    # Small chunks, so several date groups are carried across chunk boundaries
+    streamed = _reconcile(export, monkeypatch, stream=True, chunk_size=50)
+
+    assert streamed["streamed"] and not loaded["streamed"]
+    assert streamed["sheets"] == loaded["sheets"]
+    assert streamed["errors"] == loaded["errors"]
+
+################################################################################
+def test_ungrouped_export_is_loaded_in_full(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    export = write_qb_export(tmp_path / "qb.csv", seed=3, grouped=False)
+
+    loaded = _reconcile(export, monkeypatch)
+    streamed = _reconcile(export, monkeypatch, stream=True, chunk_size=50)
+
+    assert not streamed["streamed"]
+    assert streamed["sheets"] == loaded["sheets"]
+    assert streamed["errors"] == loaded["errors"]
+
+################################################################################
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, Optional
+
+from App.Classes import MemberName, QBServiceRecord, RecordChange
+from App.RecordDiff import RecordDiff
+from App.Spreadsheet import Spreadsheet
+from Utilities.Enums import ChangeKind
+from fakes import fetched_cell, make_payload
+################################################################################
+def _written_payload() -> Dict[str, Any]:
+    """A payload whose tabs show exactly what the app writes for their records, in write order."""
+
+    payload = make_payload(seed=5)
+    spreadsheet = Spreadsheet(None, payload, None, track_changes=True)
+    for sheet, raw in zip(spreadsheet._sheets, payload["sheets"]):
+        data = raw["data"][0]
+        data["rowData"] = [data["rowData"][0]] + [
+            {"values": [fetched_cell(cell) for cell in record.to_row_data()["values"]]}
+            for record in sheet.write_order()
+        ]
+
+    return payload
+
+################################################################################
+def _load(payload: Optional[Dict[str, Any]] = None) -> Spreadsheet:
+
+    return Spreadsheet(None, payload or _written_payload(), None, track_changes=True)
+
+################################################################################
+def test_unchanged_sheets_have_no_changes() -> None:
+
+    for sheet in _load()._sheets:
+        assert list(RecordDiff.of_sheet(sheet)) == []
+
+################################################################################
+def test_amount_edit_is_a_field_change() -> None:
+
+    sheet = _load()._sheets[0]
+    record = sheet.write_order()[10]
+    before = record._amount
+    record._amount = before + 5
+
+    assert list(RecordDiff.of_sheet(sheet)) == [
+        RecordChange(sheet.title, ChangeKind.Amount, record._key, 12, before, before + 5),
+    ]
+
+################################################################################
+def test_deleted_record_leaves_the_rest_in_place() -> None:
+
+    sheet = _load()._sheets[0]
+    record = sheet.write_order()[3]
+    record.delete()
+
+    assert list(RecordDiff.of_sheet(sheet)) == [
+        RecordChange(sheet.title, ChangeKind.Delete, record._key, 5, before=sheet._snapshot[record._key]),
+    ]
+
+################################################################################
+def test_new_record_is_inserted() -> None:
+
+    sheet = _load()._sheets[0]
+    sheet.add_row(QBServiceRecord(
+        raw={},
+        index=0,
+        account_id=1001,
+        names=[MemberName(first="Zed", last="Quinn", raw="Zed Quinn")],
+        memo="Memo",
+        amount=89.0,
+        date=date(2024, 3, 1),
+    ))
+    record = sheet._records[-1]
+    row = sheet.write_order().index(record) + 2
+
+    assert list(RecordDiff.of_sheet(sheet)) == [
+        RecordChange(sheet.title, ChangeKind.Insert, record._key, row, after=record.snapshot()._replace(row=row)),
+    ]
+
+################################################################################
+def test_moved_record_is_deleted_and_inserted() -> None:
+
+    sheet = _load()._sheets[0]
+    record = sheet.write_order()[0]
+    # Sorts after every other dated record
+    record._expiry_date = date(2099, 1, 1)
+
+    assert list(RecordDiff.of_sheet(sheet)) == [
+        RecordChange(sheet.title, ChangeKind.Delete, record._key, 2, before=sheet._snapshot[record._key]),
+        RecordChange(
+            sheet.title, ChangeKind.Insert, record._key, sheet.record_count + 1,
+            after=record.snapshot()._replace(row=sheet.record_count + 1),
+        ),
+    ]
+
+################################################################################
+def test_monthly_merge_deletes_the_merged_record() -> None:
+
+    sheet = next(s for s in _load()._sheets if s.base_title() == "Monthly")
+    master, other = next(records for records in sheet._by_account.values() if len(records) > 1)[:2]
+    before, total = master._amount, master._amount + other._amount
+    master.merge(other)
+
+    changes = list(RecordDiff.of_sheet(sheet))
+    row = sheet.write_order().index(master) + 2
+
+    assert changes[0] == RecordChange(
+        sheet.title, ChangeKind.Delete, other._key, sheet._snapshot[other._key].row, before=sheet._snapshot[other._key]
+    )
+    assert RecordChange(sheet.title, ChangeKind.Amount, master._key, row, before, total) in changes
+    # Only the two records are affected; nothing else moves
+    assert {change.key for change in changes} == {master._key, other._key}
+
+################################################################################
+def test_recolored_row_needs_rewriting() -> None:
+
+    payload = _written_payload()
+    cell = payload["sheets"][0]["data"][0]["rowData"][4]["values"][1]
+    cell["effectiveFormat"]["backgroundColorStyle"] = {"rgbColor": {"red": 0.2, "green": 0.4, "blue": 0.6}}
+
+    sheet = _load(payload)._sheets[0]
+    record = sheet.write_order()[3]
+
+    assert list(RecordDiff.of_sheet(sheet)) == [
+        RecordChange(sheet.title, ChangeKind.Display, record._key, 5),
+    ]
+
+################################################################################
+def test_patch_requests_rewrite_only_the_changed_rows() -> None:
+
+    sheet = _load()._sheets[0]
+    sheet.write_order()[10]._amount += 5
+
+    updates = [r["updateCells"]["range"] for r in sheet.patch_requests(99) if "updateCells" in r]
+    assert [(u["startRowIndex"], u["endRowIndex"]) for u in updates] == [(11, 12)]
+
+################################################################################
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import random
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+import pytest
+
+import App.Reconciler
+from App.Reconciler import ServiceReconciler
+from App.Spreadsheet import Spreadsheet
+from Utilities.Colors import WHITE
+from fakes import FakeClient, StubRules, StubSignal, displayed, fetched_cell, make_payload, write_qb_export
+################################################################################
+
+LAST_RUN = date(2025, 5, 1)
+LAST_SUFFIX = f" - {LAST_RUN.strftime('%m-%d-%Y')}"
+RUN_DATE = "06-01-2025"
+RELEVANT = ("Annual", "Monthly", "Plumbing - Annual", "Generator", "Duct Cleaning")
+
+################################################################################
+def _raw_cell(fetched: Dict[str, Any]) -> Dict[str, Any]:
+    """A grid cell typed in by hand that shows as the ``fetched`` cell."""
+
+    cell: Dict[str, Any] = {"userEnteredFormat": {"backgroundColorStyle": fetched["effectiveFormat"]["backgroundColorStyle"]}}
+    if fetched.get("formattedValue"):
+        cell["userEnteredValue"] = {"stringValue": fetched["formattedValue"]}
+    return cell
+
+################################################################################
+def _load_previous_run(client: FakeClient, seed: int) -> Spreadsheet:
+    """
+    Seeds the fake server with the dated tabs of a previous run and loads
+    them. The previous run wrote each record's row, then users edited the
+    tabs: some rows were recolored or retyped cell by cell, some cells were
+    made bold, and some rows have notes right of RELEVANT_COLS. The loaded
+    payload is read back from those grids through the relevant columns only,
+    as with the real field mask.
+    """
+    rng = random.Random(seed)
+    payload = make_payload(seed, LAST_SUFFIX)
+
+    written = Spreadsheet(client, payload, LAST_RUN, track_changes=True)
+    for sheet, raw in zip(written._sheets, payload["sheets"]):
+        props = raw["properties"]
+        data = raw["data"][0]
+        tab = client.server.add_tab(props["sheetId"], props["title"], props["gridProperties"]["rowCount"])
+        tab["colSizes"] = {c: meta["pixelSize"] for c, meta in enumerate(data["columnMetadata"])}
+
+        title = Spreadsheet.title_row_payload(props["sheetId"], props["title"])["appendCells"]
+        for col, value in enumerate(title["rows"][0]["values"]):
+            tab["cells"][(0, col)] = value
+
+        columns = len(data["rowData"][0]["values"])
+        for row, record in enumerate(sheet.write_order(), start=1):
+            if rng.random() < 0.3:
+                # Edited by hand, cell by cell
+                fetched = data["rowData"][sheet._snapshot[record._key].row - 1]["values"]
+                cells = [_raw_cell(value) for value in fetched]
+            else:
+                cells = record.to_row_data()["values"]
+            for col, cell in enumerate(cells):
+                cell = json.loads(json.dumps(cell))
+                if rng.random() < 0.05:
+                    cell.setdefault("userEnteredFormat", {})["textFormat"] = {"bold": True}
+                tab["cells"][(row, col)] = cell
+            # A hidden note, and a note in the last column, which trims keep
+            for col in (14, 25):
+                if rng.random() < 0.2:
+                    tab["cells"][(row, col)] = {"userEnteredValue": {"stringValue": f"note {row}"}}
+
+        data["rowData"] = [data["rowData"][0]] + [
+            {"values": [fetched_cell(tab["cells"].get((row, col), {})) for col in range(columns)]}
+            for row in range(1, sheet.record_count + 1)
+        ]
+
+    return Spreadsheet(client, payload, LAST_RUN, track_changes=True)
+
+################################################################################
+def _visible(tabs: Dict[str, Any]) -> Dict[str, Any]:
+    """The tabs with each cell reduced to what the app reads, blank cells dropped."""
+
+    visible = {}
+    for title, tab in tabs.items():
+        cells = {}
+        for row, col, cell in tab["cells"]:
+            shown = displayed(json.loads(cell))
+            if shown != ("", WHITE):
+                cells[(row, col)] = shown
+        visible[title] = {**tab, "cells": cells}
+    return visible
+
+################################################################################
+def _write_back(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    *,
+    occupied: Sequence[int] = (),
+    max_bytes: int = 2_000_000,
+    **kwargs: Any
+) -> Dict[str, Any]:
+    """
+    Reconciles a seeded previous run and returns the new tabs' contents.
+    ``occupied`` adds tabs with those sheetIds that the load doesn't see.
+    """
+
+    client = FakeClient(max_bytes=max_bytes)
+    monkeypatch.setattr(App.Reconciler, "get_client", lambda: client)
+
+    reconciler = ServiceReconciler(StubRules())
+    reconciler._spreadsheet = spreadsheet = _load_previous_run(client, seed=7)
+    reconciler.load_qb_export(write_qb_export(tmp_path / "qb.csv", seed=7))
+    reconciler.reconcile_all(StubSignal(), StubSignal())
+
+    for sheet_id in occupied:
+        client.server.add_tab(sheet_id, f"Older tab {sheet_id}", 10)
+    spreadsheet.final_batch_update(reconciler, RUN_DATE, **kwargs)
+
+    state = client.server.state()
+    return {
+        "applied": client.server.applied,
+        "tabs": {title: tab for title, tab in state.items() if RUN_DATE in title},
+    }
+
+################################################################################
+@pytest.mark.parametrize("mode", ["concurrent", "one_shot", "patch"])
+def test_writeback_modes_match_sequential(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mode: str
+) -> None:
+
+    expected = _write_back(tmp_path, monkeypatch, mode="sequential")
+    actual = _write_back(tmp_path, monkeypatch, mode=mode)
+
+    assert expected["tabs"]
+    if mode == "patch":
+        # Copied tabs keep the user's formatting, so compare what the app reads
+        assert _visible(actual["tabs"]) == _visible(expected["tabs"])
+    else:
+        assert actual["tabs"] == expected["tabs"]
+
+################################################################################
+def test_patch_writeback_copies_previous_tabs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    full = _write_back(tmp_path, monkeypatch, mode="sequential")
+    patched = _write_back(tmp_path, monkeypatch, mode="patch")
+
+    # Every relevant tab is duplicated rather than appended from scratch
+    assert patched["applied"]["duplicateSheet"] == 5
+    assert full["applied"]["duplicateSheet"] == 0
+
+################################################################################
+def test_patch_writeback_keeps_user_formatting(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    full = _write_back(tmp_path, monkeypatch, mode="sequential")
+    patched = _write_back(tmp_path, monkeypatch, mode="patch")
+
+    def bold(tabs: Dict[str, Any]) -> int:
+        # Below the title row, which the app writes in bold
+        return sum('"bold": true' in cell for tab in tabs.values() for row, _, cell in tab["cells"] if row > 0)
+
+    # Rows the run didn't change are left as the user formatted them
+    assert bold(patched["tabs"]) > 0
+    assert bold(full["tabs"]) == 0
+
+################################################################################
+@pytest.mark.parametrize("mode", ["sequential", "one_shot"])
+def test_run_formatting_matches_inline(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mode: str
+) -> None:
+
+    inline = _write_back(tmp_path, monkeypatch, mode=mode, formats="inline")
+    runs = _write_back(tmp_path, monkeypatch, mode=mode, formats="runs")
+
+    assert runs["applied"]["repeatCell"] > inline["applied"]["repeatCell"]
+    assert runs["tabs"] == inline["tabs"]
+
+################################################################################
+@pytest.mark.parametrize("mode", ["one_shot", "patch"])
+def test_planned_sheet_ids_skip_tabs_outside_the_load(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mode: str
+) -> None:
+
+    # Occupy every ID the plan would pick if it only knew the loaded tabs
+    titles = [f"{name} - {RUN_DATE}" for name in (*RELEVANT, "Summary", "Parsing Errors")]
+    occupied = Spreadsheet._planned_sheet_ids(titles, set()).values()
+
+    expected = _write_back(tmp_path, monkeypatch, mode="sequential")
+    actual = _write_back(tmp_path, monkeypatch, mode=mode, occupied=occupied)
+
+    assert _visible(actual["tabs"]) == _visible(expected["tabs"])
+
+################################################################################
+def test_patch_writeback_splits_large_updates(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    expected = _write_back(tmp_path, monkeypatch, mode="sequential")
+    # Small enough that runs of changed rows must be split
+    actual = _write_back(tmp_path, monkeypatch, mode="patch", max_bytes=20_000)
+
+    assert _visible(actual["tabs"]) == _visible(expected["tabs"])
+
+################################################################################